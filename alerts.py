@@ -0,0 +1,292 @@
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+from bar_cache import shared_cache
+from signals import DOWN, UP, get_signal_engine
+
+ABOVE, BELOW = "Above", "Below"
+PRICE, SIGNAL = "price", "signal"
+
+# Environment variable naming a JSON-lines file every fired alert is also appended to (unset: none)
+ALERT_LOG_ENV = "ALGO_ALERT_LOG"
+
+# How many fired alerts are kept per owner for the dashboards
+RECENT_ALERTS = 50
+
+# One delivered alert: level is the price threshold, or the signal name of an indicator-cross alert
+FiredAlert = namedtuple('FiredAlert', ['alert_id', 'owner', 'symbol', 'kind', 'condition', 'level', 'price', 'time'])
+
+
+class Alert:
+    __slots__ = ('id', 'owner', 'symbol', 'kind', 'condition', 'level', 'once', 'active')
+
+    def __init__(self, owner, symbol, kind, condition, level, once=True):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.symbol = symbol
+        self.kind = kind
+        self.condition = condition
+        self.level = level
+        self.once = once
+        self.active = True
+
+
+# Function to describe a fired alert in the words the dashboards use
+def describe(fired):
+    direction = 'above' if fired.condition == ABOVE else 'below'
+    if fired.kind == PRICE:
+        return f"{fired.symbol} crossed {direction} {fired.level:.2f} (last {fired.price:.2f})"
+    fast, slow = fired.level[4:].split('/')
+    return f"{fired.symbol}: EMA {fast} crossed {direction} EMA {slow}"
+
+
+# Price thresholds of one symbol and direction in sorted order, so a price move finds the levels it crossed by
+# bisection. Fired and cancelled alerts are dropped lazily, once they outnumber the live ones.
+class ThresholdIndex:
+    def __init__(self):
+        self.levels = []
+        self.alerts = []
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.alerts) - self.dead
+
+    def add(self, alert):
+        position = bisect.bisect_right(self.levels, alert.level)
+        self.levels.insert(position, alert.level)
+        self.alerts.insert(position, alert)
+
+    # Live alerts with a level in (low, high], or [low, high) with closed_low
+    def between(self, low, high, closed_low=False):
+        if closed_low:
+            start, stop = bisect.bisect_left(self.levels, low), bisect.bisect_left(self.levels, high)
+        else:
+            start, stop = bisect.bisect_right(self.levels, low), bisect.bisect_right(self.levels, high)
+        return [alert for alert in self.alerts[start:stop] if alert.active]
+
+    def retire(self, count=1):
+        self.dead += count
+        if self.dead > len(self.alerts) // 2:
+            live = [(level, alert) for level, alert in zip(self.levels, self.alerts) if alert.active]
+            self.levels = [level for level, _ in live]
+            self.alerts = [alert for _, alert in live]
+            self.dead = 0
+
+
+# Sink that keeps the latest fired alerts per owner, for the dashboards
+class RecentAlerts:
+    def __init__(self, maxlen=RECENT_ALERTS):
+        self.maxlen = maxlen
+        self._fired = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, fired):
+        with self._lock:
+            for alert in fired:
+                self._fired.setdefault(alert.owner, deque(maxlen=self.maxlen)).append(alert)
+
+    # An owner's latest fired alerts, newest first
+    def for_owner(self, owner, count=10):
+        with self._lock:
+            return list(self._fired.get(owner, ()))[:-count - 1:-1]
+
+
+# Sink that appends every fired alert to a JSON-lines file, for anything outside the dashboard to pick up
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, fired):
+        with self._lock, open(self.path, 'a') as file:
+            file.writelines(json.dumps(alert._asdict()) + "\n" for alert in fired)
+
+
+# Price-threshold and indicator-cross alerts. A new price checks only the thresholds between the previous
+# price and itself (O(log n + k) per symbol); a signal flip looks its alerts up directly. Each batch of
+# fired alerts goes to every sink: fn(fired), called on the thread that fed the price or signal.
+class AlertEngine:
+    def __init__(self, sinks=()):
+        self.recent = RecentAlerts()
+        self.sinks = [self.recent, *sinks]
+        self.alerts = {}
+        self._thresholds = {}  # (symbol, condition) -> ThresholdIndex
+        self._signals = {}     # (symbol, signal, state) -> [alert, ...]
+        self._last = {}        # symbol -> last price seen
+        self._lock = threading.Lock()
+        self.last_error = None  # Why the last feed_prices() failed, if it did
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    # Alert when the price crosses `level` going up (ABOVE) or down (BELOW)
+    def add_price_alert(self, owner, symbol, condition, level, once=True):
+        if condition not in (ABOVE, BELOW):
+            raise ValueError(f"Unknown alert condition: {condition}")
+        if level is None or level <= 0:
+            raise ValueError("Price alerts need a positive price")
+        alert = Alert(owner, symbol, PRICE, condition, float(level), once)
+        with self._lock:
+            self.alerts[alert.id] = alert
+            self._thresholds.setdefault((symbol, condition), ThresholdIndex()).add(alert)
+        return alert
+
+    # Alert when a signal engine crossover (e.g. "ema 10/20") turns ABOVE (fast over slow) or BELOW
+    def add_signal_alert(self, owner, symbol, signal, condition, once=True):
+        if condition not in (ABOVE, BELOW):
+            raise ValueError(f"Unknown alert condition: {condition}")
+        alert = Alert(owner, symbol, SIGNAL, condition, signal, once)
+        state = UP if condition == ABOVE else DOWN
+        with self._lock:
+            self.alerts[alert.id] = alert
+            self._signals.setdefault((symbol, signal, state), []).append(alert)
+        return alert
+
+    def cancel(self, alert_id):
+        with self._lock:
+            alert = self.alerts.pop(alert_id, None)
+            if alert is not None and alert.active:
+                self._retire(alert)
+
+    def _retire(self, alert):
+        alert.active = False
+        if alert.kind == PRICE:
+            self._thresholds[(alert.symbol, alert.condition)].retire()
+        else:
+            state = UP if alert.condition == ABOVE else DOWN
+            self._signals[(alert.symbol, alert.level, state)].remove(alert)
+
+    def _fire(self, alerts, price, at):
+        fired = []
+        for alert in alerts:
+            fired.append(FiredAlert(alert.id, alert.owner, alert.symbol, alert.kind, alert.condition, alert.level, price, at))
+            if alert.once:
+                del self.alerts[alert.id]
+                self._retire(alert)
+        return fired
+
+    def _deliver(self, fired):
+        if fired:
+            for sink in self.sinks:
+                sink(fired)
+        return fired
+
+    # Feed {symbol: price} (one cadence of the price stream); returns the alerts that fired
+    def on_prices(self, prices, at=None):
+        at = time.time() if at is None else at
+        fired = []
+        with self._lock:
+            for symbol, price in prices.items():
+                if price != price:  # NaN: no price this time
+                    continue
+                last = self._last.get(symbol)
+                self._last[symbol] = price
+                if last is None or price == last:
+                    continue
+                if price > last:
+                    index = self._thresholds.get((symbol, ABOVE))
+                    crossed = index.between(last, price) if index else []
+                else:
+                    index = self._thresholds.get((symbol, BELOW))
+                    crossed = index.between(price, last, closed_low=True) if index else []
+                if crossed:
+                    fired.extend(self._fire(crossed, price, at))
+        return self._deliver(fired)
+
+    def on_price(self, symbol, price, at=None):
+        return self.on_prices({symbol: price}, at)
+
+    # Signal engine listener: alerts on each flipped signal are found by key, so the cost follows the flips
+    def on_signals(self, events):
+        fired = []
+        with self._lock:
+            for event in events:
+                alerts = self._signals.get((event.symbol, event.signal, event.state))
+                if alerts:
+                    fired.extend(self._fire(list(alerts), self._last.get(event.symbol, float('nan')), event.time))
+        return self._deliver(fired)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# Function to get the process-wide alert engine, listening to the signal engine's flips
+def get_alert_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            log = os.environ.get(ALERT_LOG_ENV)
+            engine = AlertEngine([JsonlSink(log)] if log else [])
+            get_signal_engine().add_listener(engine.on_signals)
+            _engine = engine
+        return _engine
+
+
+# Function to pass the latest close of freshly refreshed symbols to the alert engine. Like update_signals,
+# failures (a sink that cannot write, say) go to the engine's last_error, so the bar refresh is still published.
+def feed_prices(symbols, interval='1m', period="1d"):
+    engine = get_alert_engine()
+    prices = {}
+    for symbol in symbols:
+        data = shared_cache.get((symbol, interval, period))
+        if data is not None and not data.empty:
+            prices[symbol] = float(data['Close'].iloc[-1])
+    try:
+        fired = engine.on_prices(prices)
+    except Exception as e:
+        engine.last_error = e
+        return []
+    engine.last_error = None
+    return fired
+
+
+# Measure a session at one-minute cadence: python alerts.py --alerts 50000 --symbols 500 --minutes 375
+if __name__ == "__main__":
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Benchmark the indexed price-alert engine")
+    parser.add_argument("--alerts", type=int, default=50000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--minutes", type=int, default=375)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f"SYM{i}.NS" for i in range(args.symbols)]
+    walks = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (args.minutes, len(symbols))), axis=0))
+
+    engine = AlertEngine()
+    started = time.perf_counter()
+    for i in range(args.alerts):
+        engine.add_price_alert(f"user{i % 100}", symbols[i % len(symbols)], ABOVE if i % 2 else BELOW,
+                               round(100 * (1 + rng.normal(0, 0.03)), 2))
+    added = time.perf_counter() - started
+
+    # The same alerts scanned naively, for comparison: every alert checked against every price
+    naive = [(alert.symbol, alert.condition, alert.level) for alert in engine.alerts.values()]
+
+    fired = 0
+    seconds, naive_seconds = [], []
+    last = dict(zip(symbols, walks[0]))
+    engine.on_prices(last)
+    for minute in range(1, args.minutes):
+        prices = dict(zip(symbols, walks[minute].tolist()))
+        started = time.perf_counter()
+        fired += len(engine.on_prices(prices))
+        seconds.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        sum(1 for symbol, condition, level in naive
+            if (last[symbol] < level <= prices[symbol] if condition == ABOVE else prices[symbol] <= level < last[symbol]))
+        naive_seconds.append(time.perf_counter() - started)
+        last = prices
+
+    print(f"{args.alerts:,} alerts over {len(symbols)} symbols added in {added:.2f}s")
+    print(f"indexed: median {np.median(seconds) * 1000:.2f} ms, max {max(seconds) * 1000:.2f} ms per minute")
+    print(f"naive scan: median {np.median(naive_seconds) * 1000:.2f} ms per minute")
+    print(f"{fired:,} alerts fired over {args.minutes - 1} minutes")
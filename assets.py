@@ -0,0 +1,44 @@
+import functools
+import os
+
+# Header image shipped with the dashboard, and where its resized copies are kept
+HEADER_IMAGE = "img.jpg"
+ASSET_CACHE_DIR = ".asset_cache"
+
+# Widths the header is prepared at: the centered layout's column, and double that for high-DPI screens
+HEADER_WIDTHS = (704, 1408)
+JPEG_QUALITY = 82
+
+
+# Function to build a resized, recompressed copy of an image once; later calls reuse the file on disk
+def image_variant(source, width, cache_dir=ASSET_CACHE_DIR):
+    name, _ = os.path.splitext(os.path.basename(source))
+    variant = os.path.join(cache_dir, f"{name}_{width}.jpg")
+    if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(source):
+        return variant
+
+    from PIL import Image  # Only needed the first time a variant is built
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        partial = variant + ".partial"
+        image.save(partial, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(partial, variant)  # Another process never sees a half-written file
+    return variant
+
+
+# Function to get the header image's bytes at a prepared width. Kept in memory for the process, so
+# every run of every session hands Streamlit the same bytes and the browser reuses its cached copy.
+@functools.lru_cache(maxsize=None)
+def header_image(width=HEADER_WIDTHS[-1], source=HEADER_IMAGE):
+    with open(image_variant(source, width), 'rb') as file:
+        return file.read()
+
+
+# Prepare every header width ahead of a deploy: python assets.py
+if __name__ == "__main__":
+    for width in HEADER_WIDTHS:
+        size = len(header_image(width))
+        print(f"{image_variant(HEADER_IMAGE, width)}: {size / 1024:.0f} KB")
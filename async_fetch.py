@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeout
+from market_data import fetch_bars, WATCHLIST
+
+# Most provider requests allowed in flight at once
+MAX_CONCURRENT_FETCHES = 8
+
+# Seconds a single request may take before its caller gives up on it
+FETCH_TIMEOUT_SECONDS = 10
+
+# How often a caller waiting on a request wakes up to let its UI interrupt it
+WAIT_SLICE_SECONDS = 0.25
+
+# Provider calls block, so they run on this pool while the event loop only coordinates them
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix="fetch")
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+# Function to get the event loop that runs on its own daemon thread for callers without one (Streamlit)
+def background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="fetch-loop", daemon=True).start()
+        return _loop
+
+
+# Function to fetch one symbol's bars with a deadline. The thread doing the request cannot be killed,
+# but the caller is released at the deadline and the late result still lands in the shared cache.
+async def fetch_bars_async(symbol, interval='1m', period="1d", timeout=FETCH_TIMEOUT_SECONDS, **download_kwargs):
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fetch_bars, symbol, interval=interval, period=period, **download_kwargs)
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_executor, call), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"No response for {symbol} within {timeout}s")
+
+
+# Function to fetch many symbols concurrently, at most `limit` at a time; returns {symbol: (data, error_message)}
+async def fetch_watchlist_async(symbols=WATCHLIST, limit=MAX_CONCURRENT_FETCHES, timeout=FETCH_TIMEOUT_SECONDS, **download_kwargs):
+    semaphore = asyncio.Semaphore(limit)
+
+    async def fetch_one(symbol):
+        async with semaphore:
+            try:
+                return symbol, (await fetch_bars_async(symbol, timeout=timeout, **download_kwargs), None)
+            except Exception as e:
+                return symbol, (None, str(e))  # One slow or failing symbol must not sink the others
+
+    return dict(await asyncio.gather(*(fetch_one(symbol) for symbol in symbols)))
+
+
+# Sync wrapper for fetch_watchlist_async
+def fetch_watchlist(symbols=WATCHLIST, limit=MAX_CONCURRENT_FETCHES, timeout=FETCH_TIMEOUT_SECONDS, **download_kwargs):
+    coroutine = fetch_watchlist_async(symbols, limit=limit, timeout=timeout, **download_kwargs)
+    return asyncio.run_coroutine_threadsafe(coroutine, background_loop()).result()
+
+
+# One outstanding request per slot (e.g. one session's chart); a new request cancels the one it replaces
+class RequestSlots:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def submit(self, slot, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, background_loop())
+        with self._lock:
+            stale = self._pending.get(slot)
+            self._pending[slot] = future
+        if stale is not None:
+            stale.cancel()
+        future.add_done_callback(functools.partial(self._release, slot))
+        return future
+
+    def _release(self, slot, future):
+        with self._lock:
+            if self._pending.get(slot) is future:
+                del self._pending[slot]
+
+
+# The slots every session in this process shares
+request_slots = RequestSlots()
+
+
+# Function to fetch bars for a slot; raises CancelledError if a newer request for the same slot replaced it.
+# With tick, the wait is cut into short slices and tick() runs between them, so a UI (Streamlit) can stop the
+# waiting run; the request is then cancelled rather than left holding the slot.
+def fetch_latest(slot, symbol, interval='1m', period="1d", timeout=FETCH_TIMEOUT_SECONDS, tick=None, **download_kwargs):
+    future = request_slots.submit(slot, fetch_bars_async(symbol, interval=interval, period=period, timeout=timeout, **download_kwargs))
+    try:
+        while True:
+            try:
+                return future.result(timeout=None if tick is None else WAIT_SLICE_SECONDS)
+            except FutureTimeout:
+                tick()
+    except CancelledError:
+        raise CancelledError(f"Request for {symbol} was replaced by a newer one")
+    finally:
+        future.cancel()  # Nothing once the request is done; otherwise the run was stopped while waiting
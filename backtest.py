@@ -0,0 +1,98 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from data_provider import get_provider
+from indicators import align_prices, ema_matrix
+from market_data import WATCHLIST
+
+
+# Function to collapse intraday bars into one open/close per session, which is what the gap rule trades
+def sessionize(frame):
+    return frame.groupby(frame.index.date).agg({'Open': 'first', 'Close': 'last'})
+
+
+# Function to turn a (time x symbol) matrix of per-bar returns into per-symbol statistics
+def summarize(returns, in_market):
+    returns = np.where(in_market, returns, 0.0)
+    returns = np.nan_to_num(returns)
+    bars = in_market.sum(axis=0)
+    wins = ((returns > 0) & in_market).sum(axis=0)
+
+    equity = np.cumsum(returns, axis=0)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=0), 0.0)  # Equity starts at zero
+    drawdown = (peak - equity).max(axis=0) if len(equity) else np.zeros(returns.shape[1])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hit_rate = wins / bars
+    return {'trades': bars, 'hit_rate': hit_rate, 'pnl': equity[-1] if len(equity) else drawdown, 'max_drawdown': drawdown}
+
+
+# Function to backtest the open-vs-previous-close rule from the dashboard on (time x symbol) matrices.
+# Open at or above the previous close means Buy, below means Sell; the position is held from open to close.
+def backtest_gap(opens, closes):
+    previous_close = np.vstack([np.full((1, closes.shape[1]), np.nan), closes[:-1]])
+    position = np.where(opens >= previous_close, 1.0, -1.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = position * (closes - opens) / opens
+    in_market = ~np.isnan(returns) & ~np.isnan(previous_close)
+    return summarize(returns, in_market)
+
+
+# Function to backtest an EMA crossover: long while the fast EMA is above the slow one, short while below.
+# The position decided on a bar's close earns the next bar's close-to-close return.
+def backtest_ema_cross(closes, fast, slow, emas=None, periods=None):
+    if emas is None:
+        periods = [fast, slow]
+        emas = ema_matrix(closes, periods)
+    fast_ema = emas[periods.index(fast)].T  # (time x symbol) views
+    slow_ema = emas[periods.index(slow)].T
+
+    position = np.sign(fast_ema - slow_ema)[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = position * (closes[1:] - closes[:-1]) / closes[:-1]
+    in_market = ~np.isnan(returns) & (position != 0)
+    return summarize(returns, in_market)
+
+
+# Function to run every strategy over a dict of {symbol: frame} and return one row per symbol and strategy
+def run_backtest(frames, ema_pairs=((10, 20), (20, 50)), intraday=False):
+    frames = {symbol: frame for symbol, frame in frames.items() if not frame.empty}
+    symbols = list(frames)
+    tables = []
+
+    sessions = {symbol: sessionize(frame) for symbol, frame in frames.items()} if intraday else frames
+    _, _, opens = align_prices(sessions, 'Open')
+    _, _, session_closes = align_prices(sessions, 'Close')
+    tables.append(('gap', backtest_gap(opens, session_closes)))
+
+    _, _, closes = align_prices(frames, 'Close')
+    periods = sorted({period for pair in ema_pairs for period in pair})
+    emas = ema_matrix(closes, periods)  # Every period for every symbol in one pass
+    for fast, slow in ema_pairs:
+        tables.append((f'ema_{fast}_{slow}', backtest_ema_cross(closes, fast, slow, emas, periods)))
+
+    rows = []
+    for strategy, stats in tables:
+        table = pd.DataFrame(stats, index=symbols)
+        table.insert(0, 'strategy', strategy)
+        rows.append(table)
+    return pd.concat(rows).rename_axis('symbol').reset_index()
+
+
+# Backtest the watchlist: python backtest.py --interval 1d --period 10y
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the dashboard's suggestion rule and EMA crossovers")
+    parser.add_argument("symbols", nargs="*", default=WATCHLIST)
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--period", default="10y")
+    args = parser.parse_args()
+
+    frames = get_provider().download_many(args.symbols, period=args.period, interval=args.interval, progress=False)
+    started = time.perf_counter()
+    results = run_backtest(frames, intraday=not args.interval.endswith(("d", "wk", "mo")))
+    elapsed = time.perf_counter() - started
+
+    pd.set_option('display.width', 200)
+    print(results.to_string(index=False))
+    print(f"\n{len(frames)} symbols backtested in {elapsed:.2f}s")
@@ -0,0 +1,100 @@
+import time
+import threading
+
+# Longest a cached frame may live, so daily and weekly bars still pick up today's moves
+MAX_TTL_SECONDS = 15 * 60
+
+_INTERVAL_UNITS = {"m": 60, "h": 3600, "d": 86400, "wk": 7 * 86400, "mo": 30 * 86400}
+
+
+# Function to convert a yfinance interval ("1m", "1h", "1d", "1wk", "1mo") into seconds
+def interval_seconds(interval):
+    for unit in ("wk", "mo", "m", "h", "d"):
+        if interval.endswith(unit):
+            return int(interval[:-len(unit)]) * _INTERVAL_UNITS[unit]
+    raise ValueError(f"Unknown interval: {interval}")
+
+
+# Function to pick how long bars of a given interval stay fresh
+def bar_ttl(interval):
+    return min(interval_seconds(interval), MAX_TTL_SECONDS)
+
+
+# One fetch in progress; threads that miss on the same key wait on it instead of fetching again
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Process-wide cache of bar frames keyed by (symbol, interval, period), shared by every Streamlit session
+class BarCache:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (data, fetched_at)
+        self._inflight = {}  # key -> _Flight
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0}
+
+    def get(self, key, ttl=None):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or (ttl is not None and self.clock() - entry[1] >= ttl):
+            return None
+        return entry[0]
+
+    def age(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else self.clock() - entry[1]
+
+    def put(self, key, data):
+        with self._lock:
+            self._entries[key] = (data, self.clock())
+
+    # With serve_stale, a caller that finds a refresh already in flight gets the expired frame straight away
+    def get_or_fetch(self, key, fetch, ttl, serve_stale=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[1] < ttl:
+                self.stats["hits"] += 1
+                return entry[0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.stats["misses"] += 1
+            elif serve_stale and entry is not None:
+                self.stats["stale"] += 1
+                return entry[0]
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch()
+            # Empty frames are how yfinance reports failures, so they are not worth keeping
+            if flight.result is not None and not getattr(flight.result, 'empty', False):
+                self.put(key, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# The cache every session in this process shares
+shared_cache = BarCache()
@@ -0,0 +1,121 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from data_provider import OHLCV_COLUMNS, as_utc
+
+# Environment variable with the store directory; set it to "off" to disable the store
+STORE_DIR_ENV = "ALGO_BAR_STORE"
+DEFAULT_STORE_DIR = ".bar_store"
+
+# One fixed-size record per bar, so partitions can be appended to and memory-mapped as they are
+BAR_DTYPE = np.dtype([('time', '<i8')] + [(column, '<f8') for column in OHLCV_COLUMNS])
+
+
+# On-disk OHLCV store: <root>/<interval>/<symbol>/<YYYY-MM-DD>.bin, one append-only file per session date
+class BarStore:
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._last = {}  # (symbol, interval) -> last stored time in ns, so appends skip the directory scan
+
+    def _symbol_dir(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol)
+
+    def partitions(self, symbol, interval):
+        directory = self._symbol_dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".bin"))
+
+    def _load(self, symbol, interval, date):
+        path = os.path.join(self._symbol_dir(symbol, interval), f"{date}.bin")
+        count = os.path.getsize(path) // BAR_DTYPE.itemsize  # Ignores a torn record left by a crash mid-write
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def _timezone(self, symbol, interval):
+        path = os.path.join(self._symbol_dir(symbol, interval), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as meta:
+            return json.load(meta).get("tz")
+
+    def last_timestamp(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._last:
+            dates = self.partitions(symbol, interval)
+            records = self._load(symbol, interval, dates[-1]) if dates else []
+            self._last[key] = int(records[-1]['time']) if len(records) else None
+        return self._last[key]
+
+    # Append completed bars; anything at or before the last stored bar is skipped, so the files never get rewritten
+    def append(self, symbol, interval, data):
+        if data is None or data.empty:
+            return 0
+        with self._lock:
+            times = as_utc(pd.DatetimeIndex(data.index)).tz_convert(None).values.astype('datetime64[ns]').astype('<i8')
+            last = self.last_timestamp(symbol, interval)
+            new = times > last if last is not None else np.ones(len(times), dtype=bool)
+            if not new.any():
+                return 0
+
+            records = np.zeros(int(new.sum()), dtype=BAR_DTYPE)
+            records['time'] = times[new]
+            for column in OHLCV_COLUMNS:
+                records[column] = data[column].to_numpy(dtype=float)[new] if column in data else np.nan
+
+            directory = self._symbol_dir(symbol, interval)
+            os.makedirs(directory, exist_ok=True)
+            timezone = getattr(data.index, 'tz', None)
+            if timezone is not None and not os.path.exists(os.path.join(directory, "meta.json")):
+                with open(os.path.join(directory, "meta.json"), "w") as meta:
+                    json.dump({"tz": str(timezone)}, meta)
+
+            # Partition by the session date the bars carry in their own timezone
+            dates = pd.DatetimeIndex(data.index[new]).strftime("%Y-%m-%d")
+            for date in pd.unique(dates):
+                with open(os.path.join(directory, f"{date}.bin"), "ab") as partition:
+                    records[dates == date].tofile(partition)
+            self._last[(symbol, interval)] = int(records['time'][-1])
+            return len(records)
+
+    # Read bars in [start, end]; only the partitions that can overlap the range are opened
+    def read(self, symbol, interval, start=None, end=None, sessions=None):
+        dates = self.partitions(symbol, interval)
+        if sessions is not None:
+            dates = dates[-sessions:]
+        start_ns = as_utc(start).value if start is not None else None
+        end_ns = as_utc(end).value if end is not None else None
+        if start is not None:
+            # A day either side, because partition dates are local while the range is in UTC
+            dates = [date for date in dates if date >= str((as_utc(start) - pd.Timedelta(days=1)).date())]
+        if end is not None:
+            dates = [date for date in dates if date <= str((as_utc(end) + pd.Timedelta(days=1)).date())]
+
+        chunks = []
+        for date in dates:
+            records = self._load(symbol, interval, date)
+            lo = 0 if start_ns is None else np.searchsorted(records['time'], start_ns, side='left')
+            hi = len(records) if end_ns is None else np.searchsorted(records['time'], end_ns, side='right')
+            if hi > lo:
+                chunks.append(np.array(records[lo:hi]))  # Copy out so the memory map can be released
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=BAR_DTYPE)
+
+        index = pd.DatetimeIndex(pd.to_datetime(records['time'], unit='ns', utc=True))
+        timezone = self._timezone(symbol, interval)
+        if timezone is not None:
+            index = index.tz_convert(timezone)
+        return pd.DataFrame({column: records[column] for column in OHLCV_COLUMNS}, index=index)
+
+
+# Function to build the store selected by the environment, or None when it is switched off
+def store_from_env():
+    root = os.environ.get(STORE_DIR_ENV, DEFAULT_STORE_DIR)
+    return None if root == "off" else BarStore(root)
+
+
+# The store every session in this process shares
+bar_store = store_from_env()
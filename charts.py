@@ -0,0 +1,119 @@
+import math
+import os
+import shutil
+import plotly
+import streamlit as st
+import streamlit.components.v1 as components
+from downsample import chart_view
+
+# Static frontend (no build step) that keeps the figure in the browser and applies patches to it
+CHART_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chart_frontend")
+
+
+# Function to serve the installed plotly package's own plotly.js with the component, so the chart uses the
+# release the pinned package bundles without a CDN; the copy is replaced whenever the installed file changes
+def install_plotly_js(directory=CHART_FRONTEND_DIR):
+    source = os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+    target = os.path.join(directory, "plotly.min.js")
+    installed = os.stat(source)
+    try:
+        copied = os.stat(target)
+        if copied.st_size == installed.st_size and copied.st_mtime == installed.st_mtime:
+            return target
+    except FileNotFoundError:
+        pass
+    partial = target + ".partial"
+    shutil.copy2(source, partial)  # Keeps the mtime, which is what the next start compares
+    os.replace(partial, target)
+    return target
+
+
+install_plotly_js()
+_live_chart = components.declare_component("live_chart", path=CHART_FRONTEND_DIR)
+
+# Height of the chart in pixels
+CHART_HEIGHT = 450
+
+# Candle columns every chart sends
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+# Function to turn a column into JSON-safe floats (JSON has no NaN, Plotly draws None as a gap)
+def _json_values(values):
+    return [None if math.isnan(value) else float(value) for value in values]
+
+
+# Function to format bar times as the exchange's wall-clock time, which is what the axis should show
+def _json_times(index):
+    return [moment.strftime('%Y-%m-%d %H:%M:%S') for moment in index]
+
+
+# What the browser holds for one symbol's chart, and the patch that brings it up to date.
+# Each patch resends the last bar the browser has (the forming candle may have been revised) plus new bars,
+# so its size depends on how many bars arrived since the last refresh, not on the length of the day.
+# Views that are zoomed in or too long to draw bar by bar are downsampled and resent whole instead,
+# which MAX_POINTS_PER_TRACE keeps bounded just the same.
+class LiveChart:
+    def __init__(self):
+        self.seq = 0
+        self.sent = 0
+        self.first = None
+        self.periods = None
+        self.resynced = 0
+        self.viewport = None
+
+    def invalidate(self):
+        self.sent = 0
+
+    def patch(self, data, ema_periods, title):
+        periods = list(ema_periods)
+        candles, lines, reshaped = chart_view(data, periods, self.viewport)
+        full = (reshaped or self.sent == 0 or len(data) < self.sent or data.index[0] != self.first
+                or periods != self.periods)
+        start = 0 if full else self.sent - 1
+
+        self.seq += 1
+        candle_patch = {column: _json_values(candles[column].to_numpy()[start:]) for column in PRICE_COLUMNS}
+        candle_patch['x'] = _json_times(candles.index[start:])
+        patch = {
+            'seq': self.seq,
+            'reset': full,
+            'start': start,
+            'candles': candle_patch,
+            'lines': {period: {'x': _json_times(line.index[start:]), 'y': _json_values(line.to_numpy()[start:])}
+                      for period, line in lines.items()},
+        }
+        if full:
+            patch.update(title=title, emas=periods, height=CHART_HEIGHT)
+
+        # After a downsampled view the browser's points are not the bars, so the next patch starts over
+        self.sent = 0 if reshaped else len(data)
+        self.first = data.index[0] if len(data) else None
+        self.periods = periods
+        return patch
+
+
+# Function to get this session's chart state for a symbol
+def session_chart(symbol):
+    if "live_charts" not in st.session_state:
+        st.session_state["live_charts"] = {}
+    charts = st.session_state["live_charts"]
+    if symbol not in charts:
+        charts[symbol] = LiveChart()
+    if st.session_state.get("live_chart_shown") != symbol:
+        # A chart that was off screen was unmounted, so the browser starts from nothing again
+        charts[symbol].invalidate()
+        st.session_state["live_chart_shown"] = symbol
+    return charts[symbol]
+
+
+# Function to draw a symbol's candlestick chart with EMAs, sending only what changed since the last refresh
+def display_live_chart(data, ema_periods, chart_title, symbol):
+    chart = session_chart(symbol)
+    reply = _live_chart(patch=chart.patch(data, ema_periods, chart_title), key=f"live-chart-{symbol}", default=None) or {}
+    # The browser missed a patch (e.g. its frame was reloaded) or was zoomed: redraw for what it needs now
+    if reply.get('resync', 0) > chart.resynced or reply.get('viewport') != chart.viewport:
+        chart.resynced = reply.get('resync', 0)
+        chart.viewport = reply.get('viewport')
+        chart.invalidate()
+        st.experimental_rerun()
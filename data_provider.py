@@ -0,0 +1,222 @@
+import os
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from resilience import ProviderError, ResilientProvider, in_background
+
+# Environment variables used to pick the market-data backend
+PROVIDER_ENV = "ALGO_DATA_PROVIDER"  # "yfinance" (default), "local" or "record"
+FIXTURE_DIR_ENV = "ALGO_FIXTURE_DIR"
+DEFAULT_FIXTURE_DIR = "fixtures"
+
+# Columns of an OHLCV frame, in the order yfinance returns them
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# yfinance.download collects results in module globals (shared._DFS, shared._ERRORS) that every call resets,
+# so two calls in flight at once overwrite each other; they take turns. Each call still fetches its own
+# tickers on yfinance's threads. A waiting dashboard call goes before any waiting background call, so it
+# waits for at most the one download already in flight.
+class _DownloadTurns:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._busy = False
+        self._foreground = 0  # Foreground callers waiting for a turn
+
+    @contextmanager
+    def turn(self, background=False):
+        with self._condition:
+            if not background:
+                self._foreground += 1
+            while self._busy or (background and self._foreground):
+                self._condition.wait()
+            if not background:
+                self._foreground -= 1
+            self._busy = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+
+_yfinance_turns = _DownloadTurns()
+
+
+# Backend that downloads bars from Yahoo Finance through yfinance
+class YFinanceProvider:
+    name = "yfinance"
+    host = "query1.finance.yahoo.com"
+
+    def download(self, symbol, period="1d", interval='1m', start=None, **kwargs):
+        import yfinance as yf  # Imported here so the local backend runs without yfinance installed
+        if start is not None:
+            # yfinance reads datetimes as local wall time, so hand it the local time of the same instant
+            kwargs['start'] = datetime.fromtimestamp(as_utc(start).timestamp())
+        with _yfinance_turns.turn(background=in_background()):
+            data = yf.download(symbol, period=period, interval=interval, **kwargs)
+            errors = dict(getattr(yf.shared, '_ERRORS', {}))
+        if data.empty and errors:
+            # yfinance prints failures (throttling included) instead of raising; raise so they can be retried
+            raise ProviderError("; ".join(f"{ticker}: {error}" for ticker, error in errors.items()))
+        return data
+
+    def download_many(self, symbols, period="1d", interval='1m', threads=True, **kwargs):
+        # One batched request for every symbol, grouped so each ticker gets its own column block
+        data = self.download(list(symbols), period=period, interval=interval, group_by='ticker', threads=threads, **kwargs)
+        return split_by_symbol(data, symbols)
+
+    def history(self, symbol, period="1d"):
+        import yfinance as yf
+        data = yf.Ticker(symbol).history(period=period)
+        if data.empty:
+            raise ProviderError(f"No price history returned for {symbol}")
+        return data
+
+
+# Backend that serves recorded OHLCV files from disk (one CSV per symbol and interval)
+class LocalFileProvider:
+    name = "local"
+
+    def __init__(self, directory=DEFAULT_FIXTURE_DIR):
+        self.directory = directory
+
+    def path_for(self, symbol, interval):
+        return os.path.join(self.directory, f"{symbol}_{interval}.csv")
+
+    def download(self, symbol, period="1d", interval='1m', start=None, **kwargs):
+        path = self.path_for(symbol, interval)
+        if not os.path.exists(path):
+            # yfinance returns an empty frame for unknown symbols, so do the same
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        if start is not None:
+            # Like yfinance, an explicit start wins over the period
+            return data[as_utc(data.index) >= as_utc(start)]
+        return trim_to_period(data, period)
+
+    def download_many(self, symbols, period="1d", interval='1m', threads=True, **kwargs):
+        return {symbol: self.download(symbol, period=period, interval=interval, **kwargs) for symbol in symbols}
+
+    def history(self, symbol, period="1d"):
+        return self.download(symbol, period=period, interval='1d')
+
+    def save(self, symbol, interval, data):
+        os.makedirs(self.directory, exist_ok=True)
+        data.to_csv(self.path_for(symbol, interval))
+
+
+# Backend that forwards to another provider and records every frame it returns
+class RecordingProvider:
+    name = "record"
+
+    def __init__(self, provider, recorder):
+        self.provider = provider
+        self.recorder = recorder
+
+    def download(self, symbol, period="1d", interval='1m', **kwargs):
+        data = self.provider.download(symbol, period=period, interval=interval, **kwargs)
+        if not data.empty and 'start' not in kwargs:
+            self.recorder.save(symbol, interval, data)
+        return data
+
+    def download_many(self, symbols, period="1d", interval='1m', threads=True, **kwargs):
+        frames = self.provider.download_many(symbols, period=period, interval=interval, threads=threads, **kwargs)
+        if 'start' not in kwargs:
+            for symbol, data in frames.items():
+                if not data.empty:
+                    self.recorder.save(symbol, interval, data)
+        return frames
+
+    def history(self, symbol, period="1d"):
+        data = self.provider.history(symbol, period=period)
+        if not data.empty:
+            self.recorder.save(symbol, '1d', data)
+        return data
+
+
+# Function to split a grouped multi-ticker download into one frame per symbol
+def split_by_symbol(data, symbols):
+    symbols = list(symbols)
+    if not isinstance(data.columns, pd.MultiIndex):
+        # yfinance drops the ticker level when only one symbol was asked for
+        return {symbols[0]: data}
+    frames = {}
+    for symbol in symbols:
+        if symbol in data.columns.get_level_values(0):
+            # Exchanges trade at different hours, so each symbol only keeps the rows it has bars for
+            frames[symbol] = data[symbol].dropna(how='all')
+        else:
+            frames[symbol] = pd.DataFrame(columns=OHLCV_COLUMNS)
+    return frames
+
+
+# Function to read timestamps as UTC; naive ones are taken to already be UTC
+def as_utc(value):
+    if isinstance(value, pd.DatetimeIndex):
+        return value.tz_localize('UTC') if value.tz is None else value.tz_convert('UTC')
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+# Function to cut a recorded frame down to the requested yfinance-style period ("1d", "5d", "1mo", "1y", "max")
+def trim_to_period(data, period):
+    if data.empty or period in (None, "max"):
+        return data
+    if period.endswith("mo"):
+        start = data.index[-1] - pd.DateOffset(months=int(period[:-2]))
+        return data[data.index > start]
+    if period.endswith("y"):
+        start = data.index[-1] - pd.DateOffset(years=int(period[:-1]))
+        return data[data.index > start]
+    if period.endswith("d"):
+        # "Nd" means the last N sessions that have bars, not N calendar days
+        days = data.index.normalize()
+        sessions = days.unique()
+        return data[days >= sessions[-min(int(period[:-1]), len(sessions))]]
+    return data
+
+
+# Function to build the provider selected by the environment
+def provider_from_env():
+    kind = os.environ.get(PROVIDER_ENV, "yfinance")
+    directory = os.environ.get(FIXTURE_DIR_ENV, DEFAULT_FIXTURE_DIR)
+    if kind == "local":
+        return LocalFileProvider(directory)
+    if kind == "record":
+        return RecordingProvider(ResilientProvider(YFinanceProvider()), LocalFileProvider(directory))
+    return ResilientProvider(YFinanceProvider())
+
+
+_provider = None
+
+
+# Function to get the process-wide provider
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = provider_from_env()
+    return _provider
+
+
+# Function to swap the process-wide provider (e.g. for benchmarks or a faster feed)
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+
+# Record fixtures for offline runs: python data_provider.py ^NSEI ^NSEBANK --interval 1m --period 1d
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record OHLCV fixtures for the local provider")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--period", default="1d")
+    parser.add_argument("--directory", default=os.environ.get(FIXTURE_DIR_ENV, DEFAULT_FIXTURE_DIR))
+    args = parser.parse_args()
+
+    recorder = RecordingProvider(YFinanceProvider(), LocalFileProvider(args.directory))
+    for symbol in args.symbols:
+        data = recorder.download(symbol, period=args.period, interval=args.interval, prepost=True, progress=False)
+        print(f"{symbol}: {len(data)} bars recorded")
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Most points a chart trace may carry; wider views are aggregated down to this
+MAX_POINTS_PER_TRACE = 2000
+
+# Candle sizes (seconds) a wide view can be re-aggregated to, finest first
+BUCKET_SECONDS = [60, 2 * 60, 5 * 60, 15 * 60, 30 * 60, 60 * 60, 2 * 60 * 60, 24 * 60 * 60]
+
+# Share of the visible range also sent on each side, so a short pan does not show an empty chart
+VIEWPORT_MARGIN = 0.5
+
+
+# Function to find the spacing of a frame's bars in seconds
+def bar_seconds(index):
+    if len(index) < 2:
+        return BUCKET_SECONDS[0]
+    return float(np.median(np.diff(_wall_clock_ns(index)))) / 1e9
+
+
+# Function to get bar times as nanoseconds of exchange wall-clock time, so day buckets follow the exchange's day
+def _wall_clock_ns(index):
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[ns]').astype(np.int64)
+
+
+# Function to give each bar the number of the bucket it falls in
+def bucket_keys(index, seconds):
+    return _wall_clock_ns(index) // int(seconds * 1e9)
+
+
+# Function to pick the finest bucket size that keeps a frame under max_points candles (None: no need to aggregate)
+def choose_bucket(index, max_points=MAX_POINTS_PER_TRACE):
+    if len(index) <= max_points:
+        return None
+    step = bar_seconds(index)
+    for seconds in BUCKET_SECONDS:
+        if seconds > step and len(np.unique(bucket_keys(index, seconds))) <= max_points:
+            return seconds
+    return BUCKET_SECONDS[-1]
+
+
+# Function to re-aggregate OHLCV bars into buckets of `seconds`; each candle is stamped with its first bar's time
+def resample_ohlcv(data, seconds):
+    keys = bucket_keys(data.index, seconds)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    columns = {
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(data['High'].to_numpy(dtype=np.float64), starts),
+        'Low': np.fmin.reduceat(data['Low'].to_numpy(dtype=np.float64), starts),
+        'Close': data['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in data:
+        columns['Volume'] = np.add.reduceat(np.nan_to_num(data['Volume'].to_numpy(dtype=np.float64)), starts)
+    return pd.DataFrame(columns, index=data.index[starts])
+
+
+# Function to pick which points of a line to keep with Largest-Triangle-Three-Buckets, which keeps its visual shape;
+# returns the positions of the kept points
+def lttb(x, y, threshold):
+    count = len(y)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, count - 1
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # The next bucket's average is the third corner of the triangle
+        following = slice(stop, edges[bucket + 2] if bucket + 2 < len(edges) else count)
+        x_next, y_next = x[following].mean(), y[following].mean()
+        areas = np.abs((x[previous] - x_next) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (y_next - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+# Function to cut a frame to the visible (start, end) range plus a margin on each side
+def clip_to_viewport(data, viewport):
+    start, end = (pd.Timestamp(bound) for bound in viewport)
+    if data.index.tz is not None:
+        start, end = start.tz_localize(data.index.tz), end.tz_localize(data.index.tz)
+    margin = (end - start) * VIEWPORT_MARGIN
+    return data.loc[start - margin:end + margin]
+
+
+# Function to build what a chart draws for a viewport (None: everything), keeping every trace under max_points.
+# Returns the candles, a {period: EMA series} dict, and whether the view differs from the bars themselves,
+# in which case it has to be resent whole rather than patched.
+def chart_view(data, ema_periods, viewport=None, max_points=MAX_POINTS_PER_TRACE):
+    if viewport is not None:
+        data = clip_to_viewport(data, viewport)
+    seconds = choose_bucket(data.index, max_points)
+    candles = data if seconds is None else resample_ohlcv(data, seconds)
+
+    lines = {}
+    for period in ema_periods:
+        values = data[f'EMA_{period}']
+        if seconds is not None:
+            values = values[values.notna()]
+            kept = lttb(_wall_clock_ns(values.index).astype(np.float64), values.to_numpy(dtype=np.float64), max_points)
+            values = values.iloc[kept]
+        lines[period] = values
+    return candles, lines, seconds is not None or viewport is not None
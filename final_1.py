@@ -1,112 +1,236 @@
-import yfinance as yf
+import uuid
 import streamlit as st
-import plotly.graph_objects as go
-import time
-from PIL import Image
+from layout import PageSlots
+from assets import header_image
+from symbol_registry import get_registry
+
+# Seconds a fresh session waits for the first background refresh before fetching on its own
+FIRST_REFRESH_TIMEOUT = 10
 
 # Define a dictionary of valid usernames and passwords (replace with your own)
 valid_users = {
     "SEH824": "1234",
 }
 
+# Function to get this session's request slot, so a newer request cancels the one it replaces
+def session_slot():
+    if "fetch_slot" not in st.session_state:
+        st.session_state["fetch_slot"] = uuid.uuid4().hex
+    return st.session_state["fetch_slot"]
+
 # Function to fetch live stock data
-def fetch_live_stock_data(symbol, interval='1m'):
+def fetch_live_stock_data(symbol, interval='1m', tick=None):
+    # The data stack (pandas, NumPy, providers) loads on first use, after the page has started drawing
+    from async_fetch import fetch_latest
     try:
-        live_data = yf.download(symbol, period="1d", interval=interval, prepost=True)
-        return live_data.copy(), None  # Return both data and None for error_message
+        # Bounded by a deadline; the wait keeps touching the page, so a widget change stops it and the request is dropped
+        live_data = fetch_latest(session_slot(), symbol, interval=interval, period="1d", tick=tick, incremental=True, prepost=True)
+        if live_data.empty:
+            return None, "No data available for the specified symbol."
+        stale = live_data.attrs.get('stale')
+        if stale:
+            # The provider is slow or failing: keep showing the last good bars and say how old they are
+            return live_data, f"Showing data from {stale['age']:.0f}s ago ({stale['error']})"
+        return live_data, None  # Return both data and None for error_message
     except Exception as e:
         return None, f"Error fetching live stock data: {str(e)}"  # Return None for data and the error message
 
 # Function to fetch live stock price
 def fetch_live_stock_price(symbol):
+    from quotes import get_quotes
     try:
-        stock = yf.Ticker(symbol)
-        live_price = stock.history(period="1d")["Close"].iloc[-1]
+        # Served from the bars already cached for the chart, so this normally needs no request at all
+        quote = get_quotes([symbol]).get(symbol)
+        if quote is None:
+            return None, "No price available for the specified symbol."
+        live_price = quote.price
         return live_price, None  # Return live_price and None for price_error
     except Exception as e:
         return None, f"Error fetching live stock price: {str(e)}"  # Return None for live_price and the error message
 
-# Function to calculate Exponential Moving Averages (EMAs)
-def calculate_ema(data, ema_periods):
-    for period in ema_periods:
-        data[f'EMA_{period}'] = data['Close'].ewm(span=period).mean()
+# Function to read a symbol's latest open and the close before it (the last session's until today's is known)
+def fetch_reference_price(symbol):
+    from reference_prices import reference_prices
+    try:
+        # Read from memory only; the background refresh fetches them for the whole watchlist
+        reference = reference_prices.get(symbol)
+        if reference is None:
+            return None, "The opening price is not available yet."
+        return reference, None
+    except Exception as e:
+        return None, f"Error fetching reference prices: {str(e)}"
 
-# Function to display error message
-def display_error_message(message):
-    st.markdown(f'<div class="trading-suggestion" style="background-color: red;">{message}</div>', unsafe_allow_html=True)
+# Function to calculate Exponential Moving Averages (EMAs)
+def calculate_ema(data, ema_periods, symbol):
+    from indicators import ema_engine
+    # The shared engine keeps each EMA's state, so only new or revised bars are computed
+    for period, values in ema_engine.update(symbol, data, ema_periods).items():
+        data[f'EMA_{period}'] = values
+
+# Function to display error message, in one of the page's slots if given
+def display_error_message(message, slots=None, slot='status'):
+    message_html = f'<div class="trading-suggestion" style="background-color: red;">{message}</div>'
+    if slots is None:
+        st.markdown(message_html, unsafe_allow_html=True)
+    else:
+        slots.show(slot, message_html)
+
+# Function to display the live price in its slot; also run in place while waiting for the next refresh
+def display_live_price(slots, symbol, live_price_label):
+    stock_live_price, price_error = fetch_live_stock_price(symbol)
+    if stock_live_price is not None:
+        slots.show('price', f'<h2 class="live-price">{live_price_label}: {stock_live_price:.2f}</h2>')
+    elif price_error:
+        display_error_message(price_error, slots, 'price')
 
 # Function to display candlestick chart with EMAs
-def display_candlestick_with_emas(data, ema_periods, chart_title):
-    # Create the main chart with the stock data and EMAs
-    main_fig = go.Figure()
-
-    main_fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['Open'],
-        high=data['High'],
-        low=data['Low'],
-        close=data['Close'],
-        name='Candlesticks',
-    ))
-
-    # Add the EMAs to the main chart
-    for period in ema_periods:
-        main_fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data[f'EMA_{period}'],
-            mode='lines',
-            line=dict(width=2),
-            name=f'EMA {period}'
-        ))
-
-    # Update the layout for the main chart
-    main_fig.update_layout(
-        title=chart_title,
-        xaxis_title='Time',
-        yaxis_title='Price',
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02),
-    )
-
-    # Display the main chart
-    st.plotly_chart(main_fig, use_container_width=True)
+def display_candlestick_with_emas(data, ema_periods, chart_title, symbol):
+    from charts import display_live_chart
+    # The chart stays in the browser; each refresh sends only new candles and the revised forming one
+    display_live_chart(data, ema_periods, chart_title, symbol)
 
 # Function to fetch live stock data and display it
-def fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods):
+def fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods, slots):
     # Fetch live data here
-    live_data, _ = fetch_live_stock_data(symbol)
+    live_data, error_message = fetch_live_stock_data(symbol, tick=slots.touch)
+    if error_message:
+        display_error_message(error_message, slots)
 
     if live_data is not None:
-        calculate_ema(live_data, ema_periods)  # Calculate EMAs
+        calculate_ema(live_data, ema_periods, symbol)  # Calculate EMAs
 
         # Display candlestick chart with EMAs
-        display_candlestick_with_emas(live_data, ema_periods, chart_title)
+        display_candlestick_with_emas(live_data, ema_periods, chart_title, symbol)
+        slots.place('suggestion', 'price')
 
         # Display trading suggestion
-        st.markdown(f'<div class="trading-suggestion">{trading_suggestion}</div>', unsafe_allow_html=True)
+        slots.show('suggestion', f'<div class="trading-suggestion">{trading_suggestion}</div>')
 
-        # Fetch and display live stock price
-        stock_live_price, price_error = fetch_live_stock_price(symbol)
-        if stock_live_price is not None:
-            st.markdown(f'<h2 class="live-price">{live_price_label}: {stock_live_price:.2f}</h2>', unsafe_allow_html=True)
-        if price_error:
-            display_error_message(price_error)
+        # Fetch and display live stock price, and keep it current until the next refresh
+        display_live_price(slots, symbol, live_price_label)
+        slots.on_tick(lambda: display_live_price(slots, symbol, live_price_label))
 
         # Add Buy and Sell buttons
         order_type = st.radio("Select Order Type", ["Buy", "Sell"])
 
         if order_type == "Buy" or order_type == "Sell":
-            if symbol in ["^NSEI", "^NSEBANK"]:
-                lot_size = 15
-            else:
-                lot_size = 1500
+            lot_size = get_registry().lot_size(symbol)
             quantity = st.number_input(f"Enter Quantity (lot size: {lot_size})", min_value=1)
+            price_type = st.radio("Price", ["Market", "Limit"])
+            limit_price = st.number_input("Limit Price", min_value=0.0, step=0.05) if price_type == "Limit" else None
             if st.button("Place Order"):
-                if order_type == "Buy":
-                    order_message = f"Placed a Buy order for {quantity} lots of {symbol} at {stock_live_price:.2f} each."
+                # Recorded by the paper-trading engine; the button returns without waiting for the fill
+                order, order_error = place_order(symbol, order_type, quantity, price_type, limit_price)
+                if order is None:
+                    display_error_message(order_error)
                 else:
-                    order_message = f"Placed a Sell order for {quantity} lots of {symbol} at {stock_live_price:.2f} each."
-                st.success(order_message)
+                    price_text = "at market" if limit_price is None else f"with a limit of {limit_price:.2f}"
+                    order_message = f"Placed a {order_type} order for {quantity} lots ({order.quantity} units) of {symbol} {price_text}. It fills against the next bar."
+                    st.success(order_message)
+
+# Function to get the paper-trading account of this session: the logged-in user, else the session itself
+def trading_account():
+    return st.session_state.get("user", session_slot())
+
+# Function to send an order to the paper-trading engine, which fills it against the bars that follow
+def place_order(symbol, side, lots, kind, limit_price=None):
+    from orders import get_order_engine
+    try:
+        order = get_order_engine().submit(trading_account(), symbol, side, lots, kind, limit_price)
+        return order, None
+    except Exception as e:
+        return None, f"Error placing order: {str(e)}"
+
+# Function to display the session's paper positions, marked against the latest cached prices
+def display_positions(slots):
+    from positions import get_ledger
+    from quotes import get_quotes
+    ledger = get_ledger()
+    symbols = ledger.symbols(trading_account())
+    if not symbols:
+        return
+    prices = {symbol: quote.price for symbol, quote in get_quotes(symbols).items()}
+    positions = ledger.mark(trading_account(), prices)
+    totals = f"Unrealized P&L: {positions['unrealized'].sum():.2f} | Realized P&L: {positions['realized'].sum():.2f}"
+    slots.show('positions', f'<h3>Paper Positions</h3>{positions.to_html(index=False, float_format="{:.2f}".format)}<p>{totals}</p>')
+
+# Function to say how old the chart's bars are while the background refresh is failing (no snapshot means no rerun)
+def display_refresh_status(slots, scheduler, symbol):
+    if scheduler.last_error is None:
+        return
+    from bar_cache import shared_cache
+    age = shared_cache.age((symbol, '1m', "1d"))
+    if age is not None:
+        display_error_message(f"Showing data from {age:.0f}s ago ({scheduler.last_error})", slots)
+
+# Function to display the latest signal flips across the watchlist; it only changes when a signal flips
+def display_signal_feed(slots):
+    from signals import describe, get_signal_engine
+    engine = get_signal_engine()
+    events = engine.recent(10)
+    failure = f'<div class="trading-suggestion" style="background-color: red;">Signals are not updating: {engine.last_error}</div>' if engine.last_error else ''
+    if events or failure:
+        items = "".join(f"<li>{describe(event)}</li>" for event in events)
+        slots.show('signals', f'<h3>Signal Changes</h3>{failure}<ul>{items}</ul>')
+
+# Function to display the market screener: the latest full-universe scan, ranked and narrowed to the chosen filters
+def display_screener(slots, filters):
+    from screener import filter_screen, get_screener
+    screener = get_screener()
+    table = screener.snapshot().data
+    if table is None:
+        if screener.last_error is not None:
+            slots.show('screener', f'<h3>Market Screener</h3><p>The scan failed: {screener.last_error}</p>')
+        else:
+            slots.show('screener', '<h3>Market Screener</h3><p>The first scan is still running.</p>')
+        return
+    shown = filter_screen(table, filters).head(25)
+    slots.show('screener', f'<h3>Market Screener</h3>{shown.to_html(index=False, float_format="{:.2f}".format)}')
+
+# Function to set a price alert for this session; it fires when a refreshed price crosses the level
+def set_price_alert(symbol, direction, level):
+    from alerts import get_alert_engine
+    try:
+        return get_alert_engine().add_price_alert(trading_account(), symbol, direction, level), None
+    except Exception as e:
+        return None, f"Error setting alert: {str(e)}"
+
+# Function to display the alerts that fired for this session, newest first
+def display_alerts(slots):
+    from alerts import describe, get_alert_engine
+    engine = get_alert_engine()
+    fired = engine.recent.for_owner(trading_account())
+    failure = f'<div class="trading-suggestion" style="background-color: red;">Price alerts are not updating: {engine.last_error}</div>' if engine.last_error else ''
+    if fired or failure:
+        items = "".join(f"<li>{describe(alert)}</li>" for alert in fired)
+        slots.show('alerts', f'<h3>Alerts</h3>{failure}<ul>{items}</ul>')
+
+# Function to refresh watchlist symbols; the background scheduler calls it with the symbols whose markets are due
+def refresh_watchlist(symbols):
+    from market_data import prefetch_watchlist
+    from orders import feed_bars
+    from alerts import feed_prices
+    from signals import update_signals
+    refreshed = prefetch_watchlist(symbols, incremental=True, prepost=True)
+    feed_bars(symbols)  # Resting paper orders fill against the new bars
+    update_signals()  # Every registered symbol in one pass; only flips are published
+    feed_prices(symbols)  # Fires the price alerts whose levels the move crossed
+    return refreshed
+
+# Function to suggest a trade from how the market opened against the previous close
+def opening_suggestion(name, reference):
+    # Trading strategy based on opening prices (simplified)
+    market_open = reference.open
+    previous_close = reference.previous_close  # Close price of the previous day
+
+    trading_suggestion = ""
+    if previous_close == market_open:
+        trading_suggestion = "Market was sideways. Suggest to Buy."
+    elif previous_close < market_open:
+        trading_suggestion = f"Market was down, and {name} opened higher. Suggest to Buy."
+    elif previous_close > market_open:
+        trading_suggestion = f"Market was up, and {name} opened lower. Suggest to Sell."
+    return trading_suggestion
 
 # Main function to run the dashboard
 def run_dashboard():
@@ -137,280 +261,87 @@ def run_dashboard():
 
     # Define page title and header image
     st.title("Algo Trading Dashboard")
-    image = Image.open("img.jpg")  # Replace with your exhibition image
-    st.image(image, use_column_width=True)
+    # Resized and recompressed once, then served from memory to every session
+    st.image(header_image(), use_column_width=True)
 
     # Continue with the Algo Trading Dashboard logic here
 
     # Sidebar for user input
     st.sidebar.header('Choose the Desired Option')
 
-    # Option to select what to view
-    view_option = st.sidebar.radio("Select an Option", ["Indices", "Stocks", "Global Markets"])
+    # Option to select what to view; the menus are built from the symbol registry
+    registry = get_registry()
+    view_option = st.sidebar.radio("Select an Option", registry.category_names())
 
     # Define ema_periods here
     ema_periods = [10, 20, 50]  # You can modify this list as needed
 
-    # Main loop to display charts and live prices
-    while True:
-        # Fetch live data here
-        live_data, _ = fetch_live_stock_data('^NSEI')  # Default symbol for Nifty 50
-
-        if view_option == "Indices":
-            selected_index = st.sidebar.selectbox("Select an Index", ["Nifty 50", "Bank Nifty"])
-
-            if selected_index == "Nifty 50":
-                symbol = '^NSEI'
-                chart_title = 'Nifty 50 Live Stock Data'
-                live_price_label = "Nifty 50 Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                nifty_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == nifty_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < nifty_open:
-                    trading_suggestion = "Market was down, and Nifty 50 opened higher. Suggest to Buy."
-
-                elif previous_close > nifty_open:
-                    trading_suggestion = "Market was up, and Nifty 50 opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_index == "Bank Nifty":
-                symbol = '^NSEBANK'
-                chart_title = 'Bank Nifty Live Stock Data'
-                live_price_label = "Bank Nifty Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                banknifty_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == banknifty_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < banknifty_open:
-                    trading_suggestion = "Market was down, and Bank Nifty opened higher. Suggest to Buy."
-
-                elif previous_close > banknifty_open:
-                    trading_suggestion = "Market was up, and Bank Nifty opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-        # Stocks
-        elif view_option == "Stocks":
-            selected_stock = st.sidebar.selectbox("Select a Stock", ["RELIANCE", "TCS", "Infosys", "HDFC Bank"])
-
-            if selected_stock == "RELIANCE":
-                symbol = 'RELIANCE.BO'
-                chart_title = 'Reliance Industries Live Stock Data'
-                live_price_label = "Reliance Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                reliance_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == reliance_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < reliance_open:
-                    trading_suggestion = "Market was down, and Reliance opened higher. Suggest to Buy."
-
-                elif previous_close > reliance_open:
-                    trading_suggestion = "Market was up, and Reliance opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_stock == "TCS":
-                symbol = 'TCS.BO'
-                chart_title = 'Tata Consultancy Services Live Stock Data'
-                live_price_label = "TCS Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                tcs_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == tcs_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < tcs_open:
-                    trading_suggestion = "Market was down, and TCS opened higher. Suggest to Buy."
-
-                elif previous_close > tcs_open:
-                    trading_suggestion = "Market was up, and TCS opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_stock == "Infosys":
-                symbol = 'INFY.BO'
-                chart_title = 'Infosys Live Stock Data'
-                live_price_label = "Infosys Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                infosys_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == infosys_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < infosys_open:
-                    trading_suggestion = "Market was down, and Infosys opened higher. Suggest to Buy."
-
-                elif previous_close > infosys_open:
-                    trading_suggestion = "Market was up, and Infosys opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_stock == "HDFC Bank":
-                symbol = 'HDFCBANK.BO'
-                chart_title = 'HDFC Bank Live Stock Data'
-                live_price_label = "HDFC Bank Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                hdfcbank_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == hdfcbank_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < hdfcbank_open:
-                    trading_suggestion = "Market was down, and HDFC Bank opened higher. Suggest to Buy."
-
-                elif previous_close > hdfcbank_open:
-                    trading_suggestion = "Market was up, and HDFC Bank opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-        # Global Markets
-        elif view_option == "Global Markets":
-            selected_market = st.sidebar.selectbox("Select a Global Market", ["US 30", "Dow Jones", "Nasdaq", "S&P 500", "US 30 Futur"])
-
-            if selected_market == "US 30":
-                symbol = '^DJI'
-                chart_title = 'Dow Jones Industrial Average Live Data'
-                live_price_label = "Dow Jones Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                dow_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == dow_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < dow_open:
-                    trading_suggestion = "Market was down, and Dow Jones opened higher. Suggest to Buy."
-
-                elif previous_close > dow_open:
-                    trading_suggestion = "Market was up, and Dow Jones opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_market == "Dow Jones":
-                symbol = '^DJI'
-                chart_title = 'Dow Jones Industrial Average Live Data'
-                live_price_label = "Dow Jones Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                dow_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == dow_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < dow_open:
-                    trading_suggestion = "Market was down, and Dow Jones opened higher. Suggest to Buy."
-
-                elif previous_close > dow_open:
-                    trading_suggestion = "Market was up, and Dow Jones opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_market == "Nasdaq":
-                symbol = '^IXIC'
-                chart_title = 'Nasdaq Composite Live Data'
-                live_price_label = "Nasdaq Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                nasdaq_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == nasdaq_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < nasdaq_open:
-                    trading_suggestion = "Market was down, and Nasdaq opened higher. Suggest to Buy."
-
-                elif previous_close > nasdaq_open:
-                    trading_suggestion = "Market was up, and Nasdaq opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_market == "S&P 500":
-                symbol = '^GSPC'
-                chart_title = 'S&P 500 Live Data'
-                live_price_label = "S&P 500 Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                sp500_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == sp500_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < sp500_open:
-                    trading_suggestion = "Market was down, and S&P 500 opened higher. Suggest to Buy."
-
-                elif previous_close > sp500_open:
-                    trading_suggestion = "Market was up, and S&P 500 opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-            elif selected_market == "US 30 Futur":
-                symbol = '^DJI'
-                chart_title = 'US 30 Futures Live Data'
-                live_price_label = "US 30 Futures Live Price"
-
-                # Trading strategy based on opening prices (simplified)
-                us30fut_open = live_data.iloc[0]['Open']
-                previous_close = live_data.iloc[0]['Close']  # Close price of the previous day
-
-                trading_suggestion = ""
-
-                if previous_close == us30fut_open:
-                    trading_suggestion = "Market was sideways. Suggest to Buy."
-
-                elif previous_close < us30fut_open:
-                    trading_suggestion = "Market was down, and US 30 Futures opened higher. Suggest to Buy."
-
-                elif previous_close > us30fut_open:
-                    trading_suggestion = "Market was up, and US 30 Futures opened lower. Suggest to Sell."
-
-                fetch_and_display_stock_data(symbol, chart_title, trading_suggestion, live_price_label, ema_periods)
-
-        # Add a delay to refresh data
-        time.sleep(60)  # Refresh every 60 seconds
+    # Background refresh shared by every session: open markets are fetched once per bar, closed ones not at all
+    from market_data import WATCHLIST
+    from scheduler import get_scheduler, wait_for_snapshot
+    from signals import get_signal_engine
+    get_signal_engine(ema_periods)  # Watchlist signals cross the same EMAs the chart draws
+    scheduler = get_scheduler("watchlist", refresh_watchlist, symbols=WATCHLIST)
+    snapshot = scheduler.snapshot()
+    if snapshot.version == 0:
+        snapshot = scheduler.wait_for_update(0, timeout=FIRST_REFRESH_TIMEOUT)
+
+    # The status line and the heartbeat sit above the chart, so messages coming and going never move it
+    slots = PageSlots()
+    slots.place('status', 'heartbeat')
+
+    # Every instrument runs the same pipeline; what differs between them comes from the registry
+    selected_label = st.sidebar.selectbox(registry.prompt(view_option), registry.labels(view_option))
+    instrument = registry.by_label(selected_label)
+    # The status line keeps reporting a failing background refresh between reruns
+    slots.on_tick(lambda: display_refresh_status(slots, scheduler, instrument.ticker))
+
+    # The suggestion compares the instrument's own open with its previous close
+    reference, reference_error = fetch_reference_price(instrument.ticker)
+    if reference is None:
+        display_error_message(reference_error, slots)
+        trading_suggestion = "No suggestion until the opening price is known."
+    else:
+        from reference_prices import session_day
+        trading_suggestion = opening_suggestion(instrument.name, reference)
+        if reference.day != session_day(instrument.ticker):
+            trading_suggestion = f"As of the {reference.day:%d %b} session: {trading_suggestion}"
+    fetch_and_display_stock_data(instrument.ticker, instrument.chart_title, trading_suggestion, instrument.price_label, ema_periods, slots)
+
+    # Signal flips across the whole watchlist; the feed is redrawn only when one happens, however many symbols are watched
+    slots.place('signals')
+    display_signal_feed(slots)
+    slots.on_tick(lambda: display_signal_feed(slots))
+
+    # Price alerts on the selected instrument, checked in the background against every refreshed price
+    alert_level = st.sidebar.number_input("Alert Price", min_value=0.0, step=0.05)
+    alert_direction = st.sidebar.radio("Alert When the Price Crosses", ["Above", "Below"])
+    if st.sidebar.button("Set Alert"):
+        alert, alert_error = set_price_alert(instrument.ticker, alert_direction, alert_level)
+        if alert is None:
+            display_error_message(alert_error, slots)
+        else:
+            st.sidebar.success(f"Alert set: {instrument.ticker} crossing {alert_direction.lower()} {alert_level:.2f}")
+    slots.place('alerts')
+    display_alerts(slots)
+    slots.on_tick(lambda: display_alerts(slots))
+
+    # The screener scans the whole universe in the background every few minutes; its table is updated in place
+    if view_option == "Stocks":
+        from screener import SCREEN_FILTERS
+        screener_filters = st.sidebar.multiselect("Screener Filters", list(SCREEN_FILTERS))
+        slots.place('screener')
+        display_screener(slots, screener_filters)
+        slots.on_tick(lambda: display_screener(slots, screener_filters))
+
+    # Positions are marked in place on every tick, so fills show up without waiting for a rerun
+    slots.place('positions')
+    display_positions(slots)
+    slots.on_tick(lambda: display_positions(slots))
+
+    # Wait for the next snapshot, updating the page's slots in place meanwhile, then rerun with the fresh bars
+    wait_for_snapshot(scheduler, snapshot.version, tick=slots.tick)
+    st.experimental_rerun()
 
 # Main entry point of the app
 if __name__ == "__main__":
@@ -421,19 +352,22 @@ if __name__ == "__main__":
         layout="centered"
     )
 
-    # Page content
-    st.title("Algo Trading Dashboard - Login")
-    st.subheader("Please log in to continue.")
-
-    # User input for username and password
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
-
-    # Login button
-    if st.button("Login"):
-        if username in valid_users and valid_users[username] == password:
-            st.success(f"Logged in as {username}")
-            run_dashboard()  # Call the dashboard function if login is successful
-            st.experimental_rerun()  # Clear the login page after login
-        else:
-            st.error("Invalid username or password")
+    # Logged-in sessions go straight to the dashboard, which reruns itself on every refresh
+    if "user" in st.session_state:
+        run_dashboard()
+    else:
+        # Page content
+        st.title("Algo Trading Dashboard - Login")
+        st.subheader("Please log in to continue.")
+
+        # User input for username and password
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+
+        # Login button
+        if st.button("Login"):
+            if username in valid_users and valid_users[username] == password:
+                st.session_state["user"] = username  # Stay logged in across widget changes and scheduled reruns
+                st.experimental_rerun()  # Clear the login page after login
+            else:
+                st.error("Invalid username or password")
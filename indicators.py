@@ -0,0 +1,141 @@
+import math
+import threading
+from array import array
+import numpy as np
+import pandas as pd
+
+
+# Exponential moving average fed one bar at a time; matches pandas ewm(span=period, adjust=True).mean()
+class StreamingEMA:
+    def __init__(self, period):
+        self.period = period
+        self.decay = 1 - 2 / (period + 1)
+        self.numerator = 0.0    # sum of decay**age * close
+        self.denominator = 0.0  # sum of decay**age, the adjust=True normaliser
+        self.values = array('d')
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self._before_last = (0.0, 0.0)  # state before the last bar, so a revised bar can be replayed
+
+    def update(self, timestamp, close):
+        if timestamp == self.last_timestamp:
+            # The still-forming bar changed: undo it and apply the new close
+            self.numerator, self.denominator = self._before_last
+            self.values.pop()
+        elif self.first_timestamp is None:
+            self.first_timestamp = timestamp
+
+        self._before_last = (self.numerator, self.denominator)
+        if math.isnan(close):
+            # pandas keeps decaying older weights across gaps, which leaves the mean unchanged
+            self.numerator *= self.decay
+            self.denominator *= self.decay
+        else:
+            self.numerator = close + self.decay * self.numerator
+            self.denominator = 1.0 + self.decay * self.denominator
+
+        value = self.numerator / self.denominator if self.denominator else math.nan
+        self.values.append(value)
+        self.last_timestamp = timestamp
+        return value
+
+    def as_array(self, count=None):
+        return np.frombuffer(self.values, count=len(self.values) if count is None else count).copy()
+
+
+# Process-wide EMA state per (symbol, period); each refresh only feeds the bars that are new or revised
+class EMAEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._emas = {}
+
+    def _catch_up(self, key, data, closes):
+        ema = self._emas.get(key)
+        if ema is not None and ema.first_timestamp == data.index[0]:
+            if data.index[-1] < ema.last_timestamp:
+                # An older copy of the frame (another session refreshed first); its bars are already known
+                return ema.as_array(len(data))
+            # Resume from the last bar we saw; it is replayed because it may have been revised
+            start = data.index.searchsorted(ema.last_timestamp)
+            if start == len(ema.values) - 1 and data.index[start] == ema.last_timestamp:
+                for i in range(start, len(data)):
+                    ema.update(data.index[i], closes[i])
+                return ema.as_array()
+
+        # First sight of this symbol, a new session, or history that no longer lines up: start over
+        ema = self._emas[key] = StreamingEMA(key[1])
+        for timestamp, close in zip(data.index, closes):
+            ema.update(timestamp, close)
+        return ema.as_array()
+
+    def update(self, symbol, data, ema_periods):
+        if data.empty:
+            return {period: np.array([]) for period in ema_periods}
+        closes = data['Close'].to_numpy(dtype=float)
+        with self._lock:
+            return {period: self._catch_up((symbol, period), data, closes) for period in ema_periods}
+
+    def reset(self, symbol=None):
+        with self._lock:
+            for key in [key for key in self._emas if symbol is None or key[0] == symbol]:
+                del self._emas[key]
+
+
+# The engine every session in this process shares
+ema_engine = EMAEngine()
+
+
+# Function to line up one price column of many frames into a (time x symbol) matrix; gaps are NaN
+def align_prices(frames, column='Close'):
+    symbols = list(frames)
+    prices = pd.concat({symbol: frames[symbol][column] for symbol in symbols}, axis=1)
+    return prices.index, symbols, prices.to_numpy(dtype=float)
+
+
+# Function to line up several columns of many frames into {column: (time x symbol) matrix}; gaps are NaN.
+# Frames on one exchange calendar share their index, so this is mostly array copies.
+def align_columns(frames, columns):
+    symbols = list(frames)
+    index = frames[symbols[0]].index
+    for symbol in symbols[1:]:
+        if not frames[symbol].index.equals(index):
+            index = index.union(frames[symbol].index)
+    matrices = {column: np.full((len(index), len(symbols)), np.nan) for column in columns}
+    for i, symbol in enumerate(symbols):
+        data = frames[symbol]
+        rows = index.get_indexer(data.index)
+        for column in columns:
+            matrices[column][rows, i] = data[column].to_numpy(dtype=float)
+    return index, symbols, matrices
+
+
+# Function to line up the closes of many frames into one (time x symbol) matrix
+def align_closes(frames):
+    return align_prices(frames, 'Close')
+
+
+# Function to compute every EMA period for every symbol in one pass over a (time x symbol) close matrix.
+# Returns a (period x symbol x time) array, so each symbol's line is a contiguous view.
+# NaN marks "no bar": it is skipped and the previous value carried, which equals ewm(span, ignore_na=True)
+# on that symbol's own bars.
+def ema_matrix(closes, periods):
+    closes = np.asarray(closes, dtype=float)
+    decay = (1 - 2 / (np.asarray(periods, dtype=float) + 1))[:, None]
+    values = np.empty((len(periods), closes.shape[1], closes.shape[0]))
+    numerator = np.zeros((len(periods), closes.shape[1]))
+    denominator = np.zeros_like(numerator)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for t, row in enumerate(closes):
+            numerator, denominator = ema_step(row, decay, numerator, denominator)
+            values[:, :, t] = numerator / denominator
+    return values
+
+
+# Function to fold one row of closes into running EMA sums of shape (period x symbol); NaN marks "no bar"
+def ema_step(row, decay, numerator, denominator):
+    traded = ~np.isnan(row)
+    numerator = np.where(traded, np.where(traded, row, 0.0) + decay * numerator, numerator)
+    denominator = np.where(traded, 1.0 + decay * denominator, denominator)
+    return numerator, denominator
+
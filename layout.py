@@ -0,0 +1,46 @@
+import streamlit as st
+
+
+# Named placeholders that a run creates once and then only updates in place: a run, and every wait
+# between runs, sends a fixed number of elements however long the session stays open. Messages that
+# come and go live in their own slots, so they never shift the chart below them (a moved chart frame
+# is remounted and has to be resent whole).
+class PageSlots:
+    def __init__(self):
+        self._slots = {}
+        self._shown = {}
+        self._tickers = []
+
+    # Create slots at the current position on the page
+    def place(self, *names):
+        for name in names:
+            self._slots[name] = st.empty()
+
+    def __getitem__(self, name):
+        return self._slots[name]
+
+    # Show HTML in a slot; unchanged content is not sent again
+    def show(self, name, html):
+        if self._shown.get(name) != html:
+            self._slots[name].markdown(html, unsafe_allow_html=True)
+            self._shown[name] = html
+
+    def clear(self, name):
+        if self._shown.get(name) is not None:
+            self._slots[name].empty()
+            self._shown[name] = None
+
+    # Register something to refresh in place while the page waits for the next snapshot
+    def on_tick(self, ticker):
+        self._tickers.append(ticker)
+
+    def tick(self):
+        for ticker in self._tickers:
+            ticker()
+        self.touch()
+
+    # Touching the page is what lets Streamlit stop this run when a widget changes
+    def touch(self):
+        if 'heartbeat' not in self._slots:
+            self.place('heartbeat')
+        self._slots['heartbeat'].empty()
@@ -0,0 +1,127 @@
+import math
+import pandas as pd
+from bar_cache import shared_cache, bar_ttl
+from bar_store import bar_store
+from data_provider import get_provider, trim_to_period, as_utc
+from markets import exchange_for, market_phase
+from symbol_registry import get_registry
+
+# Every ticker offered in the dashboard's menus, from the symbol registry
+WATCHLIST = get_registry().tickers()
+
+
+# Stored bars older than this are not resumed from; Yahoo only serves minute bars for about a week
+MAX_RESUME_AGE = pd.Timedelta(days=5)
+
+
+# Function to load the bars a restart can resume from out of the on-disk store
+def stored_bars(symbol, interval, period):
+    if bar_store is None:
+        return None
+    sessions = int(period[:-1]) if period.endswith("d") else None
+    data = bar_store.read(symbol, interval, sessions=sessions)
+    if data.empty or pd.Timestamp.now(tz='UTC') - as_utc(data.index[-1]) > MAX_RESUME_AGE:
+        return None
+    return trim_to_period(data, period)
+
+
+# Function to find the bars we already hold for a key: the shared cache first, then the on-disk store
+def held_bars(key):
+    held = shared_cache.get(key)
+    if held is None or held.empty:
+        held = stored_bars(*key)
+    return held
+
+
+# Function to persist the completed bars of a fresh frame
+def store_bars(key, data):
+    # The last bar may still be forming, so only the bars before it are final
+    if bar_store is not None and len(data) > 1:
+        bar_store.append(key[0], key[1], data.iloc[:-1])
+
+
+# Function to fold freshly downloaded bars into the frame we already hold
+def merge_bars(data, update):
+    if update is None or update.empty:
+        return data
+    update = update[~update.index.duplicated(keep='last')]
+    last = data.index[-1]
+
+    # Bars we already have (normally just the still-forming last candle) are revised in place
+    revised = update[update.index <= last]
+    if not revised.empty:
+        data.update(revised)
+
+    appended = update[update.index > last]
+    if not appended.empty:
+        data = pd.concat([data, appended])
+    return data
+
+
+# Function to fetch bars through the shared cache, so every session reuses one download per symbol
+def fetch_bars(symbol, interval='1m', period="1d", incremental=False, **download_kwargs):
+    key = (symbol, interval, period)
+
+    def download():
+        provider = get_provider()
+        held = held_bars(key) if incremental else None
+        data = None
+        if held is not None and not held.empty:
+            # Only ask for bars from the last one we hold onwards; it gets replaced because it may still be forming
+            update = provider.download(symbol, period=period, interval=interval, start=held.index[-1], **download_kwargs)
+            if not update.empty or shared_cache.get(key) is not None:
+                # Merged into a copy: the held frame may be the cached one other threads are reading.
+                # Trimming to the period drops yesterday's bars once a new session starts
+                data = trim_to_period(merge_bars(held.copy(), update), period)
+        if data is None:
+            # Nothing held, or stored bars Yahoo could not continue from
+            data = provider.download(symbol, period=period, interval=interval, **download_kwargs)
+        store_bars(key, data)
+        return data
+
+    # As in get_quotes: bars cannot change while the market is closed, so cached ones are served at any age
+    ttl = math.inf if market_phase(exchange_for(symbol)) == "closed" else bar_ttl(interval)
+    error = None
+    try:
+        data = shared_cache.get_or_fetch(key, download, ttl, serve_stale=True)
+    except Exception as e:
+        # Stale-while-revalidate: a failed refresh falls back to the last good frame, whatever its age
+        data, error = shared_cache.get(key), e
+        if data is None:
+            raise
+
+    data = data.copy()  # Callers add columns and relocalize the index, so never hand out the cached frame
+    age = shared_cache.age(key)
+    if error is not None or (age is not None and age >= ttl):
+        data.attrs['stale'] = {'age': age, 'error': str(error) if error is not None else "Refresh in progress"}
+    return data
+
+
+# Function to refresh the whole watchlist in one batched download and file each symbol under its own cache key.
+# With store=False the bars are only cached, not written to the on-disk store.
+def prefetch_watchlist(symbols=WATCHLIST, interval='1m', period="1d", incremental=False, threads=True, ttl=None, store=True, **download_kwargs):
+    ttl = bar_ttl(interval) if ttl is None else ttl
+    stale = [symbol for symbol in symbols if shared_cache.get((symbol, interval, period), ttl) is None]
+    if not stale:
+        return []
+
+    def download():
+        held = {symbol: held_bars((symbol, interval, period)) for symbol in stale} if incremental else {}
+        kwargs = dict(download_kwargs)
+        if incremental and all(data is not None and not data.empty for data in held.values()):
+            # One start for the whole batch: the oldest last bar, so no symbol misses a candle
+            kwargs['start'] = min(as_utc(data.index[-1]) for data in held.values())
+
+        frames = get_provider().download_many(stale, period=period, interval=interval, threads=threads, **kwargs)
+        for symbol, data in frames.items():
+            if 'start' in kwargs:
+                # Merged into a copy, so the cached frame other threads read is never written to
+                data = trim_to_period(merge_bars(held[symbol].copy(), data), period)
+            if not data.empty:
+                shared_cache.put((symbol, interval, period), data)
+                if store:
+                    store_bars((symbol, interval, period), data)
+        return stale
+
+    # Sessions that prefetch the same batch at the same moment share one request
+    return shared_cache.get_or_fetch(("watchlist", tuple(stale), interval, period), download, ttl)
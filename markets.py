@@ -0,0 +1,133 @@
+from collections import namedtuple
+from datetime import date, datetime, timedelta, time as clock
+import pandas as pd
+import pytz
+from symbol_registry import get_registry
+
+# Seconds between polls while an exchange is in its pre- or post-market session
+SLOW_POLL_SECONDS = 5 * 60
+
+# Longest the scheduler sleeps while every market is closed, so a missed holiday or DST edge is noticed
+MAX_IDLE_SECONDS = 60 * 60
+
+# Session hours in the exchange's local time; holidays is a set of dates with no session
+Exchange = namedtuple('Exchange', ['name', 'timezone', 'pre_open', 'open', 'close', 'post_close', 'holidays'])
+
+# Weekday trading holidays from the exchanges' published calendars (NSE and BSE share one, as do NYSE
+# and NASDAQ). Only 2024-2026 are listed: later years need adding as the exchanges publish them.
+INDIA_HOLIDAYS = {date.fromisoformat(day) for day in (
+    '2024-01-22', '2024-01-26', '2024-03-08', '2024-03-25', '2024-03-29', '2024-04-11', '2024-04-17',
+    '2024-05-01', '2024-05-20', '2024-06-17', '2024-07-17', '2024-08-15', '2024-10-02', '2024-11-01',
+    '2024-11-15', '2024-11-20', '2024-12-25',
+    '2025-02-26', '2025-03-14', '2025-03-31', '2025-04-10', '2025-04-14', '2025-04-18', '2025-05-01',
+    '2025-08-15', '2025-08-27', '2025-10-02', '2025-10-21', '2025-10-22', '2025-11-05', '2025-12-25',
+    '2026-01-15', '2026-01-26', '2026-03-03', '2026-03-26', '2026-03-31', '2026-04-03', '2026-04-14',
+    '2026-05-01', '2026-05-28', '2026-06-26', '2026-09-14', '2026-10-02', '2026-10-20', '2026-11-10',
+    '2026-11-24', '2026-12-25',
+)}
+US_HOLIDAYS = {date.fromisoformat(day) for day in (
+    '2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27', '2024-06-19', '2024-07-04',
+    '2024-09-02', '2024-11-28', '2024-12-25',
+    '2025-01-01', '2025-01-09', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26', '2025-06-19',
+    '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25',
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25', '2026-06-19', '2026-07-03',
+    '2026-09-07', '2026-11-26', '2026-12-25',
+)}
+
+EXCHANGES = {
+    'NSE': Exchange('NSE', 'Asia/Kolkata', clock(9, 0), clock(9, 15), clock(15, 30), clock(16, 0), INDIA_HOLIDAYS),
+    'BSE': Exchange('BSE', 'Asia/Kolkata', clock(9, 0), clock(9, 15), clock(15, 30), clock(16, 0), INDIA_HOLIDAYS),
+    'NYSE': Exchange('NYSE', 'America/New_York', clock(4, 0), clock(9, 30), clock(16, 0), clock(20, 0), US_HOLIDAYS),
+    'NASDAQ': Exchange('NASDAQ', 'America/New_York', clock(4, 0), clock(9, 30), clock(16, 0), clock(20, 0), US_HOLIDAYS),
+}
+
+# Yahoo ticker suffixes for symbols the registry does not list
+SUFFIX_EXCHANGES = {'.NS': 'NSE', '.BO': 'BSE'}
+
+
+# Function to find the exchange a symbol trades on
+def exchange_for(symbol):
+    instrument = get_registry().by_ticker(symbol)
+    if instrument is not None:
+        return EXCHANGES[instrument.exchange]
+    for suffix, name in SUFFIX_EXCHANGES.items():
+        if symbol.endswith(suffix):
+            return EXCHANGES[name]
+    return EXCHANGES['NYSE']  # Plain tickers are US listings on Yahoo
+
+
+# Function to tell whether an exchange is "pre", "open", "post" or "closed" at a moment (default: now)
+def market_phase(exchange, now=None):
+    local = datetime.now(pytz.utc) if now is None else now
+    local = local.astimezone(pytz.timezone(exchange.timezone))
+    if local.weekday() >= 5 or local.date() in exchange.holidays:
+        return "closed"
+    moment = local.time()
+    if exchange.open <= moment < exchange.close:
+        return "open"
+    if exchange.pre_open <= moment < exchange.open:
+        return "pre"
+    if exchange.close <= moment < exchange.post_close:
+        return "post"
+    return "closed"
+
+
+# Function to find the next moment any session boundary of an exchange is crossed
+def next_phase_change(exchange, now):
+    zone = pytz.timezone(exchange.timezone)
+    local = now.astimezone(zone)
+    for days in range(0, 8):
+        day = local.date() + timedelta(days=days)
+        for boundary in (exchange.pre_open, exchange.open, exchange.close, exchange.post_close):
+            moment = zone.localize(datetime.combine(day, boundary))
+            if moment > local:
+                return moment
+    return local + timedelta(days=1)
+
+
+# Function to show bar timestamps in the exchange's own timezone; naive timestamps are taken as UTC
+def localize_to_exchange(index, symbol):
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert(exchange_for(symbol).timezone)
+
+
+# Decides which symbols are due for a poll: every bar while their market is open, every few minutes
+# around the session, and not at all while it is closed
+class SessionPoller:
+    def __init__(self, symbols, bar_seconds, slow_seconds=SLOW_POLL_SECONDS):
+        self.symbols = list(symbols)
+        self.bar_seconds = bar_seconds
+        self.slow_seconds = slow_seconds
+        self._last_poll = {}
+
+    def phases(self, now):
+        return {symbol: market_phase(exchange_for(symbol), now) for symbol in self.symbols}
+
+    def due(self, now=None):
+        now = datetime.now(pytz.utc) if now is None else now
+        due = []
+        for symbol, phase in self.phases(now).items():
+            last = self._last_poll.get(symbol)
+            if last is None or phase == "open":
+                # Never polled yet means nothing to show, so even a closed market gets one poll
+                due.append(symbol)
+            elif phase in ("pre", "post") and (now - last).total_seconds() >= self.slow_seconds:
+                due.append(symbol)
+        for symbol in due:
+            self._last_poll[symbol] = now
+        return due
+
+    # Seconds to sleep before the next poll could be due
+    def next_delay(self, now=None):
+        now = datetime.now(pytz.utc) if now is None else now
+        phases = set(self.phases(now).values())
+        if "open" in phases:
+            return self.bar_seconds - (now.timestamp() % self.bar_seconds)
+        # Otherwise wake at the next session boundary at the latest, so an opening bell is never slept through
+        wake = min(next_phase_change(exchange_for(symbol), now) for symbol in self.symbols)
+        until_change = max((wake - now).total_seconds(), 1.0)
+        if phases & {"pre", "post"}:
+            return min(self.slow_seconds, until_change)
+        return min(until_change, MAX_IDLE_SECONDS)
@@ -0,0 +1,318 @@
+import argparse
+import heapq
+import itertools
+import json
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import namedtuple
+from bar_cache import shared_cache
+from symbol_registry import get_registry
+
+BUY, SELL = "Buy", "Sell"
+MARKET, LIMIT = "Market", "Limit"
+OPEN, FILLED, CANCELLED = "open", "filled", "cancelled"
+
+# Environment variable naming the order journal, and its default file
+JOURNAL_ENV = "ALGO_ORDER_JOURNAL"
+DEFAULT_JOURNAL = ".orders.jsonl"
+
+# The journal is fsynced after this many records, or this many seconds after the oldest unsynced one
+SYNC_EVERY_RECORDS = 512
+SYNC_INTERVAL_SECONDS = 0.2
+
+# One execution: quantity is in units (lots x lot size)
+Fill = namedtuple('Fill', ['order_id', 'account', 'symbol', 'side', 'quantity', 'price', 'time'])
+
+
+class Order:
+    __slots__ = ('id', 'account', 'symbol', 'side', 'kind', 'lots', 'quantity', 'limit', 'placed', 'filled', 'status')
+
+    def __init__(self, account, symbol, side, lots, kind=MARKET, limit=None, placed=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.account = account
+        self.symbol = symbol
+        self.side = side
+        self.kind = kind
+        self.lots = lots
+        self.quantity = lots * get_registry().lot_size(symbol)
+        self.limit = limit
+        self.placed = time.time() if placed is None else placed
+        self.filled = 0
+        self.status = OPEN
+
+    @property
+    def remaining(self):
+        return self.quantity - self.filled
+
+    def as_record(self):
+        return {'type': 'order', 'id': self.id, 'account': self.account, 'symbol': self.symbol, 'side': self.side,
+                'kind': self.kind, 'lots': self.lots, 'quantity': self.quantity, 'limit': self.limit,
+                'placed': self.placed}
+
+
+# Function to find the price an order executes at within a bar, or None if the bar never reaches it
+def fill_price(order, open_, high, low):
+    if order.kind == MARKET:
+        return open_
+    if order.side == BUY:
+        return min(open_, order.limit) if low <= order.limit else None
+    return max(open_, order.limit) if high >= order.limit else None
+
+
+# Resting orders for one symbol in price-time priority: market orders first, then the best limit,
+# then the earliest. A bar's volume (when the provider reports one) caps what each side can fill.
+class OrderBook:
+    def __init__(self):
+        self._sequence = itertools.count()
+        self._sides = {BUY: [], SELL: []}
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._sides.values())
+
+    def add(self, order):
+        if order.kind == MARKET:
+            price_key = 0.0
+        else:
+            price_key = -order.limit if order.side == BUY else order.limit
+        heapq.heappush(self._sides[order.side], (order.kind != MARKET, price_key, next(self._sequence), order))
+
+    def match(self, bar_time, open_, high, low, volume):
+        fills = []
+        for side, heap in self._sides.items():
+            available = volume if volume > 0 else math.inf
+            waiting = []  # Orders placed after this bar started; they keep their place for the next one
+            while heap and available > 0:
+                entry = heap[0]
+                order = entry[-1]
+                if order.status != OPEN:
+                    heapq.heappop(heap)  # Cancelled orders are dropped lazily
+                    continue
+                if order.placed >= bar_time:
+                    waiting.append(heapq.heappop(heap))
+                    continue
+                price = fill_price(order, open_, high, low)
+                if price is None:
+                    break  # The best resting order does not cross, so none behind it does
+                quantity = min(order.remaining, available)
+                order.filled += quantity
+                available -= quantity
+                if order.remaining == 0:
+                    order.status = FILLED
+                    heapq.heappop(heap)
+                fills.append(Fill(order.id, order.account, order.symbol, side, quantity, float(price), bar_time))
+            for entry in waiting:
+                heapq.heappush(heap, entry)
+        return fills
+
+
+# Append-only JSON-lines journal; writes are buffered and fsynced in batches
+class Journal:
+    def __init__(self, path, sync_every=SYNC_EVERY_RECORDS, sync_interval=SYNC_INTERVAL_SECONDS, clock=time.monotonic):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._file = open(path, 'a', buffering=1 << 16)
+        self._pending = 0
+        self._oldest = None
+
+    def append(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._pending += 1
+        if self._oldest is None:
+            self._oldest = self.clock()
+        if self._pending >= self.sync_every or self.clock() - self._oldest >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+            self._oldest = None
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+# Paper-trading engine. Callers only enqueue commands, so the UI thread never waits on matching or
+# disk; one worker thread owns the books, matches them against new bars and journals everything.
+class OrderEngine:
+    def __init__(self, journal):
+        self.journal = journal
+        self.orders = {}  # Open orders by id; the worker drops them once filled or cancelled
+        self._books = {}
+        self._last_bar = {}
+        self._listeners = []
+        self._commands = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="order-engine", daemon=True)
+                self._thread.start()
+        return self
+
+    # Queue an order for `lots` lots; it can fill from the first bar that starts after it was placed
+    def submit(self, account, symbol, side, lots, kind=MARKET, limit=None):
+        if side not in (BUY, SELL) or kind not in (MARKET, LIMIT):
+            raise ValueError(f"Unknown order: {side} {kind}")
+        if lots < 1:
+            raise ValueError("Orders need at least one lot")
+        if kind == LIMIT and (limit is None or limit <= 0):
+            raise ValueError("Limit orders need a positive limit price")
+        order = Order(account, symbol, side, int(lots), kind, limit if kind == LIMIT else None)
+        self.orders[order.id] = order
+        self._commands.put(('submit', order))
+        return order
+
+    def cancel(self, order_id):
+        self._commands.put(('cancel', order_id))
+
+    # Hand the engine a symbol's latest bars; only bars it has not seen are matched
+    def on_bars(self, symbol, data):
+        self._commands.put(('bars', symbol, data))
+
+    # Register fn(fill), called on the worker thread for every fill
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    # Run fn() on the worker thread after every command queued so far, and wait for it
+    def call(self, fn, timeout=None):
+        done = threading.Event()
+        self._commands.put(('call', fn, done))
+        return done.wait(timeout)
+
+    # Block until every command queued so far has been handled
+    def drain(self, timeout=None):
+        done = threading.Event()
+        self._commands.put(('drain', done))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                command = self._commands.get(timeout=self.journal.sync_interval)
+            except queue.Empty:
+                self.journal.sync()  # Idle: make what was written durable now rather than after the next batch
+                continue
+            try:
+                self._handle(command)
+            except Exception as e:
+                self.journal.append({'type': 'error', 'command': command[0], 'error': str(e), 'time': time.time()})
+
+    def _handle(self, command):
+        kind = command[0]
+        if kind == 'submit':
+            order = command[1]
+            self._books.setdefault(order.symbol, OrderBook()).add(order)
+            self.journal.append(order.as_record())
+        elif kind == 'cancel':
+            order = self.orders.pop(command[1], None)
+            if order is not None and order.status == OPEN:
+                order.status = CANCELLED
+                self.journal.append({'type': 'cancel', 'id': order.id, 'time': time.time()})
+        elif kind == 'bars':
+            self._match(command[1], command[2])
+        elif kind == 'call':
+            try:
+                command[1]()
+            finally:
+                command[2].set()
+        elif kind == 'drain':
+            self.journal.sync()
+            command[1].set()
+
+    def _match(self, symbol, data):
+        if data is None or len(data) < 2:
+            return
+        times = data.index[:-1]  # The last bar is still forming
+        last = self._last_bar.get(symbol)
+        start = 0 if last is None else times.searchsorted(last, side='right')
+        book = self._books.get(symbol)
+        if book is not None and len(book) and start < len(times):
+            opens, highs, lows = (data[column].to_numpy() for column in ('Open', 'High', 'Low'))
+            volumes = data['Volume'].to_numpy() if 'Volume' in data else None
+            for i in range(start, len(times)):
+                volume = volumes[i] if volumes is not None and not math.isnan(volumes[i]) else 0
+                for fill in book.match(times[i].timestamp(), opens[i], highs[i], lows[i], volume):
+                    self.journal.append({'type': 'fill', **fill._asdict()})
+                    order = self.orders.get(fill.order_id)
+                    if order is not None and order.status == FILLED:
+                        del self.orders[fill.order_id]
+                    for listener in self._listeners:
+                        listener(fill)
+        if len(times):
+            self._last_bar[symbol] = times[-1]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# Function to get the process-wide order engine, starting it on first use
+def get_order_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OrderEngine(Journal(os.environ.get(JOURNAL_ENV, DEFAULT_JOURNAL)))
+        return _engine.start()
+
+
+# Function to pass freshly refreshed bars to the order engine, so resting orders fill against them
+def feed_bars(symbols, interval='1m', period="1d"):
+    engine = get_order_engine()
+    for symbol in symbols:
+        data = shared_cache.get((symbol, interval, period))
+        if data is not None:
+            engine.on_bars(symbol, data)
+
+
+# Measure throughput: python orders.py --orders 100000 --symbols 50
+if __name__ == "__main__":
+    import numpy as np
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Benchmark the paper-trading order engine")
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=60)
+    parser.add_argument("--journal", default="bench_orders.jsonl")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f"SYM{i}.NS" for i in range(args.symbols)]
+    engine = OrderEngine(Journal(args.journal)).start()
+
+    started = time.perf_counter()
+    for i in range(args.orders):
+        kind = LIMIT if i % 4 else MARKET
+        limit = round(100 + rng.normal(0, 2), 2) if kind == LIMIT else None
+        engine.submit("bench", symbols[i % len(symbols)], BUY if i % 2 else SELL, 1, kind, limit)
+    submitted = time.perf_counter() - started
+    engine.drain()
+    queued = time.perf_counter() - started
+
+    index = pd.date_range(pd.Timestamp.now(tz='UTC').ceil('min'), periods=args.bars + 1, freq='min')
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, len(index)))
+    bars = pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes, 'Volume': 0.0}, index=index)
+    fills = []
+    engine.add_listener(fills.append)
+    matching = time.perf_counter()
+    for symbol in symbols:
+        engine.on_bars(symbol, bars)
+    engine.drain()
+    matched = time.perf_counter() - matching
+    engine.journal.close()
+    os.remove(args.journal)
+
+    print(f"submit (caller thread): {args.orders / submitted:,.0f} orders/s")
+    print(f"book + journal (worker): {args.orders / queued:,.0f} orders/s")
+    print(f"matching {args.bars} bars x {len(symbols)} symbols: {len(fills):,} fills in {matched:.2f}s")
@@ -0,0 +1,100 @@
+import json
+import threading
+import numpy as np
+import pandas as pd
+from orders import BUY, Fill, get_order_engine
+
+# Columns of a marked position table
+POSITION_COLUMNS = ['symbol', 'quantity', 'avg_cost', 'last', 'unrealized', 'realized']
+
+
+# Positions per (account, symbol), kept in NumPy columns. Each fill updates one row in O(1), so the
+# cost of a refresh depends on how many positions are open, never on how many fills came before.
+class PositionLedger:
+    def __init__(self, capacity=64):
+        self._lock = threading.Lock()
+        self._rows = {}          # (account, symbol) -> row
+        self._symbols = []       # row -> symbol
+        self._account_rows = {}  # account -> [row, ...]
+        self.quantity = np.zeros(capacity)
+        self.avg_cost = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+
+    def _row(self, account, symbol):
+        row = self._rows.get((account, symbol))
+        if row is None:
+            row = self._rows[(account, symbol)] = len(self._symbols)
+            self._symbols.append(symbol)
+            self._account_rows.setdefault(account, []).append(row)
+            if row == len(self.quantity):
+                # Grow by doubling so adding positions stays amortised O(1)
+                self.quantity, self.avg_cost, self.realized = (
+                    np.concatenate([column, np.zeros(len(column))]) for column in (self.quantity, self.avg_cost, self.realized))
+        return row
+
+    # Apply one fill: adding to a position moves its average cost, reducing it realizes P&L against that cost
+    def apply(self, fill):
+        signed = fill.quantity if fill.side == BUY else -fill.quantity
+        with self._lock:
+            row = self._row(fill.account, fill.symbol)
+            position, cost = self.quantity[row], self.avg_cost[row]
+            if position == 0 or (position > 0) == (signed > 0):
+                self.avg_cost[row] = (cost * abs(position) + fill.price * abs(signed)) / (abs(position) + abs(signed))
+            else:
+                closed = min(abs(signed), abs(position))
+                self.realized[row] += closed * (fill.price - cost) * np.sign(position)
+                if abs(signed) > abs(position):
+                    self.avg_cost[row] = fill.price  # Flipped through zero: the rest opens at the fill price
+                elif abs(signed) == abs(position):
+                    self.avg_cost[row] = 0.0
+            self.quantity[row] = position + signed
+
+    # Rebuild from the fills in an order journal
+    def replay(self, path):
+        try:
+            with open(path) as file:
+                for line in file:
+                    record = json.loads(line)
+                    if record.get('type') == 'fill':
+                        del record['type']
+                        self.apply(Fill(**record))
+        except FileNotFoundError:
+            pass
+
+    # Symbols an account holds or has traded
+    def symbols(self, account):
+        return [self._symbols[row] for row in self._account_rows.get(account, [])]
+
+    # Mark an account's positions against {symbol: last price} in one vectorized step
+    def mark(self, account, prices):
+        with self._lock:
+            rows = np.array(self._account_rows.get(account, []), dtype=np.int64)
+            symbols = [self._symbols[row] for row in rows]
+            quantity, cost, realized = self.quantity[rows], self.avg_cost[rows], self.realized[rows]
+        last = np.array([prices.get(symbol, np.nan) for symbol in symbols], dtype=np.float64)
+        unrealized = np.where(quantity != 0, (last - cost) * quantity, 0.0)
+        return pd.DataFrame({'symbol': symbols, 'quantity': quantity, 'avg_cost': cost, 'last': last,
+                             'unrealized': unrealized, 'realized': realized}, columns=POSITION_COLUMNS)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+# Function to get the process-wide ledger. It is rebuilt from the journal once, on the order engine's
+# worker, which then keeps it current fill by fill with nothing missed or counted twice in between.
+def get_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            engine = get_order_engine()
+            ledger = PositionLedger()
+
+            def attach():
+                engine.journal.sync()
+                ledger.replay(engine.journal.path)
+                engine.add_listener(ledger.apply)
+
+            engine.call(attach)
+            _ledger = ledger
+        return _ledger
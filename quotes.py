@@ -0,0 +1,66 @@
+from collections import namedtuple
+import math
+from bar_cache import shared_cache, bar_ttl
+from market_data import prefetch_watchlist
+from markets import exchange_for, market_phase
+
+# How old the daily frame may be when it is the only source of a symbol's price
+QUOTE_TTL_SECONDS = 60
+
+# Daily bars used for previous closes and for prices of symbols with no intraday bars cached
+DAILY_INTERVAL = '1d'
+DAILY_PERIOD = "5d"
+
+Quote = namedtuple('Quote', ['symbol', 'price', 'change', 'change_pct', 'timestamp'])
+
+
+# Function to read the close of the last session before the given day from daily bars
+def previous_close(daily, day=None):
+    if day is not None:
+        daily = daily[daily.index.date < day]
+    elif len(daily) > 1:
+        daily = daily.iloc[:-1]  # The last daily bar is the session being quoted
+    return daily['Close'].iloc[-1] if len(daily) else math.nan
+
+
+# Function to build a quote from the latest cached bars
+def make_quote(symbol, bars, daily):
+    if bars is not None and not bars.empty:
+        price, timestamp = bars['Close'].iloc[-1], bars.index[-1]
+        prior = previous_close(daily, timestamp.date()) if daily is not None and not daily.empty else math.nan
+    elif daily is not None and not daily.empty:
+        price, timestamp = daily['Close'].iloc[-1], daily.index[-1]
+        prior = previous_close(daily)
+    else:
+        return None
+    change = price - prior
+    return Quote(symbol, price, change, 100 * change / prior if prior else math.nan, timestamp)
+
+
+# Function to get last price, change and timestamp for many symbols at once
+def get_quotes(symbols, interval='1m', period="1d"):
+    # Prices cannot move while a market is closed, so whatever is cached answers at any age; the poller has
+    # stopped refreshing those bars, and refetching daily bars for them every minute would undo that
+    closed = {symbol for symbol in symbols if market_phase(exchange_for(symbol)) == "closed"}
+    bars = {symbol: shared_cache.get((symbol, interval, period), None if symbol in closed else bar_ttl(interval))
+            for symbol in symbols}
+
+    # Symbols with fresh intraday bars only need yesterday's close, which stays valid much longer
+    stale = []
+    for symbol in symbols:
+        if symbol in closed:
+            ttl = None
+        else:
+            ttl = bar_ttl(DAILY_INTERVAL) if bars[symbol] is not None else QUOTE_TTL_SECONDS
+        if shared_cache.get((symbol, DAILY_INTERVAL, DAILY_PERIOD), ttl) is None:
+            stale.append(symbol)
+    if stale:
+        # One batched request covers every symbol the cache could not answer
+        prefetch_watchlist(stale, interval=DAILY_INTERVAL, period=DAILY_PERIOD, ttl=0, progress=False)
+
+    quotes = {}
+    for symbol in symbols:
+        quote = make_quote(symbol, bars[symbol], shared_cache.get((symbol, DAILY_INTERVAL, DAILY_PERIOD)))
+        if quote is not None:
+            quotes[symbol] = quote
+    return quotes
@@ -0,0 +1,107 @@
+import json
+import math
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime
+import pytz
+from bar_cache import shared_cache
+from markets import exchange_for, market_phase
+from market_data import prefetch_watchlist
+from quotes import DAILY_INTERVAL, DAILY_PERIOD
+
+# Environment variable naming the file reference prices are kept in across restarts
+REFERENCE_FILE_ENV = "ALGO_REFERENCE_PRICES"
+DEFAULT_REFERENCE_FILE = ".reference_prices.json"
+
+# A symbol's prices for one session day (the exchange's local date): that session's open and the close before it
+ReferencePrice = namedtuple('ReferencePrice', ['symbol', 'day', 'previous_close', 'open'])
+
+
+# Function to get the session day a symbol is trading in, in its exchange's timezone
+def session_day(symbol, now=None):
+    now = datetime.now(pytz.utc) if now is None else now
+    return now.astimezone(pytz.timezone(exchange_for(symbol).timezone)).date()
+
+
+# Function to read the open and previous close of the latest session up to `day` out of daily bars: today's
+# once its bar exists, before that (pre-open, weekends, holidays) the last completed session's
+def reference_from_daily(symbol, daily, day):
+    if daily is None or daily.empty:
+        return None
+    index = daily.index
+    if index.tz is not None:
+        index = index.tz_convert(exchange_for(symbol).timezone)
+    dates = index.date
+    sessions = ((dates <= day) & daily['Open'].notna().to_numpy()).nonzero()[0]
+    if not len(sessions):
+        return None
+    last = sessions[-1]
+    before = daily['Close'][dates < dates[last]].dropna()
+    if before.empty:
+        return None
+    return ReferencePrice(symbol, dates[last], float(before.iloc[-1]), float(daily['Open'].iloc[last]))
+
+
+# Previous close and open of each symbol's latest session, held in a dict for O(1) reads and mirrored to
+# disk so a restart does not refetch them. Only the background refresh fetches; the dashboards just read.
+class ReferencePriceBook:
+    def __init__(self, path=DEFAULT_REFERENCE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._prices = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return {symbol: ReferencePrice(symbol, datetime.strptime(entry['day'], '%Y-%m-%d').date(),
+                                       entry['previous_close'], entry['open'])
+                for symbol, entry in saved.items()}
+
+    def _save(self):
+        saved = {symbol: {'day': price.day.isoformat(), 'previous_close': price.previous_close, 'open': price.open}
+                 for symbol, price in self._prices.items()}
+        partial = self.path + ".partial"
+        with open(partial, 'w') as file:
+            json.dump(saved, file)
+        os.replace(partial, self.path)
+
+    # A symbol's latest reference prices (today's, or the last completed session's), or None if none are known
+    def get(self, symbol, now=None):
+        price = self._prices.get(symbol)
+        if price is None or price.day > session_day(symbol, now):
+            return None
+        return price
+
+    # Fetch the reference prices that are not today's yet in one batched daily download per market state;
+    # called from the background refresh, never from a dashboard run
+    def refresh(self, symbols, now=None):
+        missing = [symbol for symbol in symbols
+                   if symbol not in self._prices or self._prices[symbol].day != session_day(symbol, now)]
+        if not missing:
+            return
+        closed = [symbol for symbol in missing if market_phase(exchange_for(symbol), now) == "closed"]
+        waiting = [symbol for symbol in missing if symbol not in closed]
+        if closed:
+            # No new session can start while the market is closed, so cached daily bars do at any age
+            prefetch_watchlist(closed, interval=DAILY_INTERVAL, period=DAILY_PERIOD, ttl=math.inf, progress=False)
+        if waiting:
+            # Cached for the daily TTL, so before the open this asks the provider at most every few minutes
+            prefetch_watchlist(waiting, interval=DAILY_INTERVAL, period=DAILY_PERIOD, progress=False)
+        found = {}
+        for symbol in missing:
+            price = reference_from_daily(symbol, shared_cache.get((symbol, DAILY_INTERVAL, DAILY_PERIOD)),
+                                         session_day(symbol, now))
+            if price is not None and price != self._prices.get(symbol):
+                found[symbol] = price
+        if found:
+            with self._lock:
+                self._prices.update(found)
+                self._save()
+
+
+# The book every session in this process shares
+reference_prices = ReferencePriceBook(os.environ.get(REFERENCE_FILE_ENV, DEFAULT_REFERENCE_FILE))
@@ -0,0 +1,183 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+# Requests per second each host is allowed, and how many may go out back to back
+RATE_PER_SECOND = 2.0
+BURST = 5
+
+# Separate, smaller budget per host for background scans (the screener), so however much a scan asks for,
+# the dashboards' requests never wait on it: they keep RATE_PER_SECOND and BURST to themselves
+BACKGROUND_RATE_PER_SECOND = 1.0
+BACKGROUND_BURST = 10
+
+# Retry schedule: up to RETRIES extra attempts, sleeping a random 0..min(cap, base * 2**attempt) seconds
+RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+# Consecutive failures that open a host's circuit, and how long it stays open before one trial request
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_SECONDS = 30.0
+
+
+# Raised when a provider answers with an error instead of data
+class ProviderError(Exception):
+    pass
+
+
+# Raised without touching the network while a host's circuit is open
+class CircuitOpenError(ProviderError):
+    pass
+
+
+# Token bucket: `rate` tokens per second, holding at most `capacity`; acquire(n) waits for n tokens.
+# A charge bigger than the bucket waits for a full bucket and leaves it in debt, so later callers wait it off.
+class TokenBucket:
+    def __init__(self, rate=RATE_PER_SECOND, capacity=BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            self.sleep(wait)
+
+
+# Circuit breaker: after FAILURE_THRESHOLD failures in a row calls fail fast until RESET_TIMEOUT passes,
+# then a single trial call decides whether to close the circuit again
+class CircuitBreaker:
+    def __init__(self, threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_SECONDS, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.clock() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self, host):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial):
+                raise CircuitOpenError(f"{host} is failing; retrying in {self.reset_timeout - (self.clock() - self.opened_at):.0f}s")
+            if state == "half-open":
+                self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+            self._trial = False
+
+
+_lane = threading.local()
+
+
+# Function to mark every provider call made on this thread inside the with-block as background work
+@contextmanager
+def background_calls():
+    previous = in_background()
+    _lane.background = True
+    try:
+        yield
+    finally:
+        _lane.background = previous
+
+
+# Function to tell whether the current thread is making background calls
+def in_background():
+    return getattr(_lane, 'background', False)
+
+
+# Function to pick a full-jitter backoff delay for a retry attempt (0 for the first retry, 1 for the next...)
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_CAP_SECONDS):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Provider wrapper that rate-limits, retries and circuit-breaks every call, per host
+class ResilientProvider:
+    def __init__(self, provider, retries=RETRIES, sleep=time.sleep):
+        self.provider = provider
+        self.name = provider.name
+        self.host = getattr(provider, 'host', provider.name)
+        self.retries = retries
+        self.sleep = sleep
+        self.bucket = host_bucket(self.host)
+        self.background_bucket = host_bucket(self.host, background=True)
+        self.breaker = host_breaker(self.host)
+
+    # tokens is what one attempt costs against the host's rate limit: the number of HTTP requests it makes.
+    # Calls inside background_calls() are charged to the host's background budget instead.
+    def call(self, method, *args, tokens=1, **kwargs):
+        bucket = self.background_bucket if in_background() else self.bucket
+        for attempt in range(self.retries + 1):
+            self.breaker.before_call(self.host)  # An open circuit fails straight away and is not retried
+            bucket.acquire(tokens)
+            try:
+                result = getattr(self.provider, method)(*args, **kwargs)
+            except Exception:
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                self.sleep(backoff_delay(attempt))
+            else:
+                self.breaker.record_success()
+                return result
+
+    def download(self, symbol, period="1d", interval='1m', **kwargs):
+        return self.call('download', symbol, period=period, interval=interval, **kwargs)
+
+    def download_many(self, symbols, period="1d", interval='1m', threads=True, **kwargs):
+        # yfinance sends one request per ticker, so a batch is charged per symbol
+        symbols = list(symbols)
+        return self.call('download_many', symbols, period=period, interval=interval, threads=threads, tokens=len(symbols), **kwargs)
+
+    def history(self, symbol, period="1d"):
+        return self.call('history', symbol, period=period)
+
+
+_buckets = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+# Function to get the rate limiter shared by every caller of a host, or by its background scans
+def host_bucket(host, background=False):
+    with _registry_lock:
+        if background:
+            return _buckets.setdefault((host, "background"), TokenBucket(BACKGROUND_RATE_PER_SECOND, BACKGROUND_BURST))
+        return _buckets.setdefault(host, TokenBucket())
+
+
+# Function to get the circuit breaker shared by every caller of a host
+def host_breaker(host):
+    with _registry_lock:
+        return _breakers.setdefault(host, CircuitBreaker())
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import namedtuple
+from bar_cache import interval_seconds
+from markets import SessionPoller
+
+# Seconds to wait after a bar closes before refreshing, so the provider has published it
+BAR_SETTLE_SECONDS = 2.0
+
+# How often a waiting session wakes up to let Streamlit handle widget input
+POLL_SECONDS = 0.5
+
+# What a refresh produced; version increases by one with every successful refresh
+Snapshot = namedtuple('Snapshot', ['version', 'created', 'data'])
+
+
+# Background thread that runs a refresh job once per bar and publishes each result as a versioned snapshot.
+# With a poller, refresh(symbols) is called only for the symbols whose markets make them due.
+class RefreshScheduler:
+    def __init__(self, refresh, interval='1m', settle=BAR_SETTLE_SECONDS, poller=None):
+        self.refresh = refresh
+        self.period = interval_seconds(interval)
+        self.settle = settle
+        self.poller = poller
+        self.last_error = None
+        self._snapshot = Snapshot(0, None, None)
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+
+    # Seconds until just after the next bar boundary, so refreshes line up with new candles
+    def next_delay(self, now=None):
+        if self.poller is not None:
+            return self.poller.next_delay() + self.settle
+        now = time.time() if now is None else now
+        return self.period - (now % self.period) + self.settle
+
+    def _run(self):
+        while not self._stopping.is_set():
+            if self.poller is None:
+                self.run_once()
+            else:
+                symbols = self.poller.due()
+                if symbols:
+                    self.run_once(symbols)
+            self._stopping.wait(self.next_delay())
+
+    def run_once(self, *args):
+        try:
+            data = self.refresh(*args)
+        except Exception as e:
+            self.last_error = e  # Keep the last good snapshot; the next bar gets another try
+            return None
+        self.last_error = None
+        return self.publish(data)
+
+    def publish(self, data):
+        with self._condition:
+            self._snapshot = Snapshot(self._snapshot.version + 1, time.time(), data)
+            self._condition.notify_all()
+            return self._snapshot
+
+    def snapshot(self):
+        return self._snapshot
+
+    # Block until a snapshot newer than `version` exists or the timeout passes; returns the latest snapshot
+    def wait_for_update(self, version, timeout=None):
+        with self._condition:
+            self._condition.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+# Function to get the process-wide scheduler for a job, starting it on first use; every session shares it.
+# Passing symbols makes polling follow each symbol's exchange hours.
+def get_scheduler(name, refresh, interval='1m', symbols=None):
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            poller = SessionPoller(symbols, interval_seconds(interval)) if symbols else None
+            scheduler = _schedulers[name] = RefreshScheduler(refresh, interval, poller=poller)
+        return scheduler.start()
+
+
+# Function to wait for the next snapshot in short slices; tick() runs between slices so the UI can interrupt
+def wait_for_snapshot(scheduler, version, tick=None, poll=POLL_SECONDS):
+    while True:
+        snapshot = scheduler.wait_for_update(version, timeout=poll)
+        if snapshot.version > version:
+            return snapshot
+        if tick is not None:
+            tick()
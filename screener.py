@@ -0,0 +1,202 @@
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from bar_cache import shared_cache
+from indicators import align_columns, ema_matrix
+from market_data import prefetch_watchlist
+from resilience import background_calls
+from scheduler import get_scheduler
+from symbol_registry import get_registry
+
+# Environment variable naming the universe file: an NSE index list (e.g. ind_nifty500list.csv, whose
+# "Symbol" column holds bare NSE symbols) or one ticker per line. Without one the registry's tickers are used.
+UNIVERSE_ENV = "ALGO_UNIVERSE"
+DEFAULT_UNIVERSE_FILE = "universe.csv"
+
+# Suffix Yahoo Finance expects on NSE symbols
+NSE_SUFFIX = ".NS"
+
+# Bars the screener scores: daily, with enough history for the slow EMA
+SCAN_INTERVAL = '1d'
+SCAN_PERIOD = "6mo"
+
+# How often the background scan runs
+SCAN_EVERY = '5m'
+
+# Symbols per provider request, and how many requests run at once. Scans are background calls: they are
+# charged to the host's background budget (see resilience), and yfinance serves one batched download at a
+# time with dashboard downloads first (see data_provider). Against yfinance the chunks therefore queue up,
+# and a small chunk keeps a dashboard download from waiting long behind one; the local backend reads them
+# in parallel.
+CHUNK_SIZE = 20
+SCAN_WORKERS = 4
+
+# Criteria: the fast/slow EMA pair watched for crossovers, the smallest gap worth flagging (percent of the
+# previous close), and the volume spike threshold against the average of the preceding sessions
+SCREEN_EMA_PERIODS = (20, 50)
+GAP_THRESHOLD_PCT = 1.0
+VOLUME_SPIKE_RATIO = 2.0
+VOLUME_LOOKBACK = 20
+
+# Columns of a screen, and the filters a dashboard can offer over its boolean columns
+SCREEN_COLUMNS = ['symbol', 'close', 'change_pct', 'gap_pct', 'volume_ratio', 'cross',
+                  'crossed', 'gapped', 'volume_spike', 'score']
+SCREEN_FILTERS = {'EMA cross': 'crossed', 'Gap': 'gapped', 'Volume spike': 'volume_spike'}
+
+# Chunks are fetched on this pool; each chunk is one batched provider request
+_pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="screener")
+
+
+# Function to read the universe: tickers in file order, bare NSE symbols suffixed, duplicates dropped.
+# A first line with a "Symbol" column marks an NSE index list; anything else is one ticker per line.
+def load_universe(path=None):
+    path = os.environ.get(UNIVERSE_ENV, DEFAULT_UNIVERSE_FILE) if path is None else path
+    try:
+        with open(path, newline='') as file:
+            lines = [line.strip() for line in file]
+    except FileNotFoundError:
+        return get_registry().tickers()
+    header = [name.strip() for name in next(csv.reader(lines[:1]), [])]
+    if 'Symbol' in header:
+        column = header.index('Symbol')
+        symbols = [row[column].strip() for row in csv.reader(lines[1:]) if len(row) > column]
+    else:
+        symbols = lines
+    symbols = [symbol if '.' in symbol or symbol.startswith('^') else symbol + NSE_SUFFIX for symbol in symbols if symbol]
+    return list(dict.fromkeys(symbols))
+
+
+# Function to fetch a universe in chunks on the worker pool; returns ({symbol: bars}, {symbol: error_message}).
+# Frames go through the shared cache, so a rescan within the bar TTL costs nothing.
+def fetch_universe(symbols, interval=SCAN_INTERVAL, period=SCAN_PERIOD, chunk_size=CHUNK_SIZE, **download_kwargs):
+    def fetch(chunk):
+        try:
+            # Screens are cheap to refetch, so their bars are cached but not written to the bar store
+            with background_calls():
+                prefetch_watchlist(chunk, interval=interval, period=period, store=False, **download_kwargs)
+            return chunk, None
+        except Exception as e:
+            return chunk, str(e)  # One failing chunk must not sink the scan
+
+    frames, errors = {}, {}
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    for chunk, error in _pool.map(fetch, chunks):
+        for symbol in chunk:
+            data = shared_cache.get((symbol, interval, period))
+            if data is not None and not data.empty:
+                frames[symbol] = data
+            else:
+                errors[symbol] = error or f"No bars returned for {symbol}"
+    return frames, errors
+
+
+# Function to score every symbol at once from {symbol: daily bars}; returns the screen ranked best first.
+# All criteria are column-wise NumPy operations over (time x symbol) matrices.
+def score_universe(frames, ema_periods=SCREEN_EMA_PERIODS, gap_threshold=GAP_THRESHOLD_PCT,
+                   spike_ratio=VOLUME_SPIKE_RATIO, lookback=VOLUME_LOOKBACK):
+    if not frames:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+    index, symbols, matrices = align_columns(frames, ['Open', 'Close', 'Volume'])
+    opens, closes, volumes = matrices['Open'], matrices['Close'], matrices['Volume']
+    columns = np.arange(len(symbols))
+
+    # Each symbol's last bar and the one before it; symbols with a shorter history have NaN gaps
+    traded = ~np.isnan(closes)
+    last = len(index) - 1 - np.argmax(traded[::-1], axis=0)
+    traded[last, columns] = False
+    previous = len(index) - 1 - np.argmax(traded[::-1], axis=0)
+    previous = np.where(traded.any(axis=0), previous, last)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        close, previous_close = closes[last, columns], closes[previous, columns]
+        previous_close = np.where(previous == last, np.nan, previous_close)
+        change_pct = (close / previous_close - 1) * 100
+        gap_pct = (opens[last, columns] / previous_close - 1) * 100
+
+        # Fast EMA minus slow EMA, on the last bar and the one before: a sign change is a crossover
+        emas = ema_matrix(closes, sorted(ema_periods))
+        spread = emas[0] - emas[-1]
+        now, before = spread[columns, last], spread[columns, previous]
+        cross = np.where((before <= 0) & (now > 0), 1, np.where((before >= 0) & (now < 0), -1, 0))
+        cross = np.where(previous == last, 0, cross)
+
+        # Last volume against the mean of up to `lookback` sessions before it, from running sums
+        counted = ~np.isnan(volumes)
+        sums = np.vstack([np.zeros(len(symbols)), np.cumsum(np.where(counted, volumes, 0.0), axis=0)])
+        counts = np.vstack([np.zeros(len(symbols)), np.cumsum(counted, axis=0)])
+        start = np.maximum(last - lookback, 0)
+        average = (sums[last, columns] - sums[start, columns]) / (counts[last, columns] - counts[start, columns])
+        volume_ratio = volumes[last, columns] / average
+
+        crossed = cross != 0
+        gapped = np.abs(gap_pct) >= gap_threshold
+        volume_spike = volume_ratio >= spike_ratio
+
+    score = crossed.astype(int) + gapped + volume_spike
+    # Most criteria met first, then the heaviest volume, then the biggest gap
+    order = np.lexsort((-np.nan_to_num(np.abs(gap_pct)), -np.nan_to_num(volume_ratio), -score))
+    table = pd.DataFrame({'symbol': symbols, 'close': close, 'change_pct': change_pct, 'gap_pct': gap_pct,
+                          'volume_ratio': volume_ratio, 'cross': cross, 'crossed': crossed, 'gapped': gapped,
+                          'volume_spike': volume_spike, 'score': score}, columns=SCREEN_COLUMNS)
+    return table.iloc[order].reset_index(drop=True)
+
+
+# Function to keep the rows meeting every chosen filter (labels of SCREEN_FILTERS), in rank order
+def filter_screen(table, filters=(), min_score=0):
+    mask = table['score'].to_numpy() >= min_score
+    for label in filters:
+        mask &= table[SCREEN_FILTERS[label]].to_numpy(dtype=bool)
+    return table[mask]
+
+
+# Function to scan the universe once: fetch it in chunks, then score it in one pass
+def run_screen(symbols=None):
+    frames, errors = fetch_universe(load_universe() if symbols is None else symbols, progress=False)
+    return score_universe(frames)
+
+
+# Function to get the process-wide screener; it rescans in the background every SCAN_EVERY and each
+# scan's ranked table is its snapshot's data
+def get_screener():
+    return get_scheduler("screener", run_screen, interval=SCAN_EVERY)
+
+
+# Measure a full-universe scan against local fixtures: python screener.py --symbols 500
+if __name__ == "__main__":
+    import tempfile
+    from data_provider import LocalFileProvider, set_provider
+
+    parser = argparse.ArgumentParser(description="Benchmark a full-universe screen against a local fixture provider")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=125)
+    parser.add_argument("--directory", help="fixture directory (default: a temporary one filled with random walks)")
+    args = parser.parse_args()
+
+    directory = args.directory or tempfile.mkdtemp(prefix="screener-fixtures-")
+    provider = LocalFileProvider(directory)
+    symbols = [f"SYM{i}{NSE_SUFFIX}" for i in range(args.symbols)]
+    if args.directory is None:
+        rng = np.random.default_rng(0)
+        index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=args.sessions)
+        for symbol in symbols:
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+            opens = closes * (1 + rng.normal(0, 0.01, len(index)))
+            volumes = rng.lognormal(12, 0.5, len(index))
+            provider.save(symbol, SCAN_INTERVAL, pd.DataFrame(
+                {'Open': opens, 'High': np.maximum(opens, closes) * 1.01, 'Low': np.minimum(opens, closes) * 0.99,
+                 'Close': closes, 'Adj Close': closes, 'Volume': volumes}, index=index))
+    set_provider(provider)
+
+    started = time.perf_counter()
+    frames, errors = fetch_universe(symbols)
+    fetched = time.perf_counter() - started
+    table = score_universe(frames)
+    scored = time.perf_counter() - started - fetched
+
+    print(f"fetch: {len(frames)} symbols in {fetched:.2f}s ({len(errors)} errors), {CHUNK_SIZE} per chunk on {SCAN_WORKERS} workers")
+    print(f"score: {scored * 1000:.0f} ms")
+    print(table.head(10).to_string(index=False))
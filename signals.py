@@ -0,0 +1,199 @@
+import argparse
+import threading
+import time
+from collections import deque, namedtuple
+import numpy as np
+from bar_cache import shared_cache
+from indicators import ema_step
+from reference_prices import reference_prices
+from symbol_registry import get_registry
+
+# EMA periods the dashboards draw; each neighbouring pair is watched for crossovers
+DEFAULT_EMA_PERIODS = (10, 20, 50)
+
+# How many recent events the engine keeps for the dashboards' feed
+EVENT_HISTORY = 200
+
+# Signal states: 0 means not known yet (no bars, or no opening price today)
+UP, DOWN, UNKNOWN = 1, -1, 0
+
+# One signal flip; state and previous are UP or DOWN, time is the bar it happened on (epoch seconds)
+SignalEvent = namedtuple('SignalEvent', ['symbol', 'signal', 'state', 'previous', 'time'])
+
+
+# Function to name the signals watched for a list of EMA periods: the gap rule, then each neighbouring pair
+def signal_names(ema_periods):
+    periods = sorted(ema_periods)
+    return ['gap'] + [f"ema {fast}/{slow}" for fast, slow in zip(periods, periods[1:])]
+
+
+# Function to describe an event in the words the dashboards use
+def describe(event):
+    if event.signal == 'gap':
+        return f"{event.symbol} opened {'higher' if event.state == UP else 'lower'}: {'Buy' if event.state == UP else 'Sell'}"
+    fast, slow = event.signal[4:].split('/')
+    return f"{event.symbol}: EMA {fast} crossed {'above' if event.state == UP else 'below'} EMA {slow}"
+
+
+# Signals for every symbol in a (signal x symbol) state matrix. The engine keeps running EMA sums for all
+# symbols and folds in only the bars completed since the last evaluation, then computes every signal in one
+# vectorized step and compares it with the previous state, so listeners and the feed only see flips.
+class SignalEngine:
+    def __init__(self, symbols, ema_periods=DEFAULT_EMA_PERIODS, history=EVENT_HISTORY):
+        self.symbols = list(symbols)
+        self.periods = sorted(ema_periods)
+        self.names = signal_names(self.periods)
+        self.state = np.zeros((len(self.names), len(self.symbols)), dtype=np.int8)
+        self.version = 0
+        self.last_error = None  # Why the last update_signals() failed, if it did
+        self._positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._decay = (1 - 2 / (np.asarray(self.periods, dtype=float) + 1))[:, None]
+        self._numerator = np.zeros((len(self.periods), len(self.symbols)))
+        self._denominator = np.zeros_like(self._numerator)
+        self._frames = [None] * len(self.symbols)  # The frame each symbol was last advanced from
+        self._first = [None] * len(self.symbols)   # First bar of the session each column's sums started from
+        self._last = [None] * len(self.symbols)    # Last completed bar folded in
+        self._times = np.full(len(self.symbols), np.nan)  # ... and its time in epoch seconds
+        self._events = deque(maxlen=history)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    # Register fn(events), called with each non-empty batch of flips
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    # Fold each symbol's newly completed bars into the running sums; returns the EMAs (period x symbol,
+    # NaN where unknown) and each symbol's last completed bar time
+    def _advance(self, frames):
+        pending = {}
+        for i, symbol in enumerate(self.symbols):
+            data = frames.get(symbol)
+            if data is None or data is self._frames[i] or len(data) < 2:
+                continue  # Frames the cache has not replaced since last time have nothing new
+            self._frames[i] = data
+            stamps = data.index.asi8[:-1]  # The last bar is still forming
+            if stamps[0] != self._first[i]:
+                # A new session (or history that no longer lines up): start this symbol's sums over
+                self._numerator[:, i] = self._denominator[:, i] = 0.0
+                self._first[i], start = stamps[0], 0
+            else:
+                start = stamps.searchsorted(self._last[i], side='right')
+            if start < len(stamps):
+                pending[i] = data['Close'].to_numpy(dtype=float)[start:len(stamps)]
+                self._last[i] = stamps[-1]
+                self._times[i] = data.index[-2].timestamp()
+
+        if pending:
+            # One row per new bar; symbols with fewer new bars are padded with NaN, which leaves them unchanged
+            closes = np.full((max(len(new) for new in pending.values()), len(self.symbols)), np.nan)
+            for i, new in pending.items():
+                closes[:len(new), i] = new
+            for row in closes:
+                self._numerator, self._denominator = ema_step(row, self._decay, self._numerator, self._denominator)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._numerator / self._denominator, self._times
+
+    # Evaluate every signal from {symbol: bars} and {symbol: ReferencePrice}; returns the flips
+    def evaluate(self, frames, references):
+        opens = np.array([np.nan if references.get(symbol) is None else references[symbol].open for symbol in self.symbols])
+        closes = np.array([np.nan if references.get(symbol) is None else references[symbol].previous_close for symbol in self.symbols])
+        with self._lock:
+            emas, times = self._advance(frames)
+            state = np.empty_like(self.state)
+            with np.errstate(invalid='ignore'):
+                # The gap rule: opening at or above the previous close suggests a Buy, below it a Sell
+                state[0] = np.where(np.isnan(opens) | np.isnan(closes), UNKNOWN, np.where(opens >= closes, UP, DOWN))
+                # Each faster EMA above its slower neighbour is UP, below it DOWN
+                state[1:] = np.sign(np.nan_to_num(emas[:-1] - emas[1:]))
+
+            # Unknown keeps the last state; moving out of unknown sets a state without reporting a flip
+            known = state != UNKNOWN
+            flipped = known & (self.state != UNKNOWN) & (state != self.state)
+            signals, positions = np.nonzero(flipped)
+            now = time.time()
+            events = [SignalEvent(self.symbols[p], self.names[s], int(state[s, p]), int(self.state[s, p]),
+                                  now if np.isnan(times[p]) else float(times[p]))
+                      for s, p in zip(signals, positions)]
+            self.state[known] = state[known]
+            if events:
+                self._events.extend(events)
+                self.version += 1
+        for listener in self._listeners if events else ():
+            listener(events)
+        return events
+
+    # {signal: state} for one symbol
+    def state_of(self, symbol):
+        column = self.state[:, self._positions[symbol]]
+        return dict(zip(self.names, column.tolist()))
+
+    # The latest events, newest first
+    def recent(self, count=10):
+        with self._lock:
+            return list(self._events)[:-count - 1:-1]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# Function to get the process-wide signal engine over every registered ticker; the first caller's EMA periods are used
+def get_signal_engine(ema_periods=DEFAULT_EMA_PERIODS):
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SignalEngine(get_registry().tickers(), ema_periods)
+        return _engine
+
+
+# Function to evaluate the signal engine against the cached bars and today's reference prices. It runs
+# after a bar refresh, so failures are kept in the engine's last_error instead of raised: the refresh
+# that called it is still published.
+def update_signals(interval='1m', period="1d"):
+    engine = get_signal_engine()
+    error = None
+    try:
+        reference_prices.refresh(engine.symbols)  # One batched download for whatever is still missing today
+    except Exception as e:
+        error = e  # The EMA signals can still be evaluated; the gap rule keeps the prices it already has
+    try:
+        frames = {symbol: shared_cache.get((symbol, interval, period)) for symbol in engine.symbols}
+        references = {symbol: reference_prices.get(symbol) for symbol in engine.symbols}
+        events = engine.evaluate(frames, references)
+    except Exception as e:
+        engine.last_error = e
+        return []
+    engine.last_error = error
+    return events
+
+
+# Measure one evaluation: python signals.py --symbols 500 --bars 375
+if __name__ == "__main__":
+    import pandas as pd
+    from reference_prices import ReferencePrice
+
+    parser = argparse.ArgumentParser(description="Benchmark the watchlist signal engine")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=375)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f"SYM{i}.NS" for i in range(args.symbols)]
+    index = pd.date_range("2024-01-02 03:45", periods=args.bars + 1, freq="min", tz="UTC")
+    walks = 100 + np.cumsum(rng.normal(0, 0.5, (len(index), len(symbols))), axis=0)
+    references = {symbol: ReferencePrice(symbol, index[0].date(), 100.0, walks[0, i]) for i, symbol in enumerate(symbols)}
+    engine = SignalEngine(symbols)
+
+    # Replay the day bar by bar, as the scheduler would hand it over
+    flips = 0
+    seconds = []
+    for bar in range(2, len(index) + 1):
+        frames = {symbol: pd.DataFrame({'Close': walks[:bar, i]}, index=index[:bar]) for i, symbol in enumerate(symbols)}
+        started = time.perf_counter()
+        flips += len(engine.evaluate(frames, references))
+        seconds.append(time.perf_counter() - started)
+
+    print(f"{len(symbols)} symbols x {len(engine.names)} signals, {len(seconds)} bars")
+    print(f"evaluation: median {np.median(seconds) * 1000:.1f} ms, max {max(seconds) * 1000:.1f} ms per bar")
+    print(f"{flips} flips, {flips / len(seconds):.1f} per bar on average")
@@ -0,0 +1,166 @@
+import argparse
+import gc
+import importlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from bar_cache import shared_cache
+from charts import LiveChart
+from indicators import EMAEngine
+
+# EMA periods the dashboard draws
+EMA_PERIODS = [10, 20, 50]
+
+
+# Function to make a day of random-walk minute bars for the soak run
+def synthetic_day(minutes, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 20000 + np.cumsum(rng.normal(0, 5, minutes))
+    index = pd.date_range('2024-01-02 09:15', periods=minutes, freq='min', tz='Asia/Kolkata')
+    return pd.DataFrame({'Open': closes - 1, 'High': closes + 3, 'Low': closes - 3, 'Close': closes,
+                         'Volume': 1000.0}, index=index)
+
+
+# Function to replay a trading day one refresh per bar through the dashboard's per-session render path
+# (EMA update, chart patch, JSON payload) and record payload size and traced memory for every hour
+def soak(hours=8, sessions=4):
+    minutes = hours * 60
+    day = synthetic_day(minutes)
+    engine = EMAEngine()
+    charts = [LiveChart() for _ in range(sessions)]
+
+    tracemalloc.start()
+    hourly = []
+    payloads = []
+    for bar in range(1, minutes + 1):
+        data = day.iloc[:bar].copy()
+        for period, values in engine.update('^NSEI', data, EMA_PERIODS).items():
+            data[f'EMA_{period}'] = values
+        for chart in charts:
+            payloads.append(len(json.dumps(chart.patch(data, EMA_PERIODS, 'Nifty 50'))))
+        if bar % 60 == 0:
+            gc.collect()
+            hour_payloads = payloads[sessions:] if bar == 60 else payloads  # The first patch is the full figure
+            hourly.append({'hour': bar // 60, 'traced_kb': tracemalloc.get_traced_memory()[0] / 1024,
+                           'mean_payload_bytes': float(np.mean(hour_payloads)),
+                           'max_payload_bytes': max(hour_payloads)})
+            payloads = []
+    tracemalloc.stop()
+    return pd.DataFrame(hourly)
+
+
+# Stand-in for the streamlit module that counts what the page sends: new elements (st.empty(), or any other
+# st.* call such as st.markdown or st.plotly_chart) and updates to placeholders that already exist
+class DeltaCounter:
+    def __init__(self):
+        self.session_state = {}
+        self.created = 0
+        self.updated = 0
+
+    def empty(self):
+        self.created += 1
+        return CountedSlot(self)
+
+    def __getattr__(self, name):
+        def element(*args, **kwargs):
+            self.created += 1
+            return CountedSlot(self)
+        return element
+
+    # (created, updated) since the last call
+    def take(self):
+        counts = (self.created, self.updated)
+        self.created = self.updated = 0
+        return counts
+
+
+class CountedSlot:
+    def __init__(self, counter):
+        self.counter = counter
+
+    def markdown(self, *args, **kwargs):
+        self.counter.updated += 1
+
+    def empty(self):
+        self.counter.updated += 1
+
+
+# Function to replay a session through a dashboard script's real page-slot render functions against a
+# DeltaCounter: one run per bar, then `ticks` waits in which the forming bar's price moves. The chart
+# frame is left out; soak() covers its payload. Returns per-run and per-tick (created, updated) counts.
+def render_soak(hours=8, ticks=4, script='f', symbol='^NSEI', label='Nifty 50 Live Price'):
+    import layout
+    from scheduler import RefreshScheduler
+    os.environ.setdefault('ALGO_ORDER_JOURNAL', os.path.join(tempfile.mkdtemp(prefix="soak-"), "orders.jsonl"))
+    dashboard = importlib.import_module(script)
+    counter = DeltaCounter()
+    layout.st = dashboard.st = counter
+
+    minutes = hours * 60
+    day = synthetic_day(minutes)
+    daily = pd.DataFrame({'Open': [19900.0, 20000.0], 'High': 20100.0, 'Low': 19800.0, 'Close': [19950.0, 20000.0]},
+                         index=pd.DatetimeIndex([day.index[0] - pd.Timedelta(days=1), day.index[0]]).normalize())
+    shared_cache.put((symbol, '1d', "5d"), daily)
+    scheduler = RefreshScheduler(lambda: None)  # Never started: a refresh that is not failing
+
+    runs, waits = [], []
+    for bar in range(1, minutes + 1):
+        shared_cache.put((symbol, '1m', "1d"), day.iloc[:bar].copy())
+
+        # The slot part of run_dashboard, in page order
+        slots = layout.PageSlots()
+        slots.place('status', 'heartbeat')
+        slots.on_tick(lambda: dashboard.display_refresh_status(slots, scheduler, symbol))
+        slots.place('suggestion', 'price')
+        slots.show('suggestion', '<div class="trading-suggestion">Suggestion</div>')
+        dashboard.display_live_price(slots, symbol, label)
+        slots.on_tick(lambda: dashboard.display_live_price(slots, symbol, label))
+        for name, display in (('signals', dashboard.display_signal_feed), ('alerts', dashboard.display_alerts),
+                              ('positions', dashboard.display_positions)):
+            slots.place(name)
+            display(slots)
+            slots.on_tick(lambda display=display: display(slots))
+        runs.append(counter.take())
+
+        for tick in range(1, ticks + 1):
+            forming = day.iloc[:bar].copy()
+            forming.iloc[-1, forming.columns.get_loc('Close')] += tick
+            shared_cache.put((symbol, '1m', "1d"), forming)
+            slots.tick()
+            waits.append(counter.take())
+    return pd.DataFrame(runs, columns=['created', 'updated']), pd.DataFrame(waits, columns=['created', 'updated'])
+
+
+# Soak the render path over a simulated session: python soak.py --hours 8 --sessions 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that per-session memory and per-update payload stay flat")
+    parser.add_argument("--hours", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--budget-kb", type=float, default=256, help="allowed memory growth per hour after the first")
+    parser.add_argument("--script", default="f", help="dashboard script whose page slots are driven")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = soak(args.hours, args.sessions)
+    elapsed = time.perf_counter() - started
+    print(report.to_string(index=False))
+
+    growth = report['traced_kb'].diff().iloc[1:].max() if len(report) > 1 else 0.0
+    # Prices grow a digit now and then, so allow a little slack on the payload
+    payload_flat = report['max_payload_bytes'].iloc[-1] <= 1.1 * report['max_payload_bytes'].iloc[0]
+    print(f"\n{args.hours}h x {args.sessions} sessions in {elapsed:.2f}s; worst hourly growth {growth:.1f} KB")
+    if growth > args.budget_kb or not payload_flat:
+        raise SystemExit("FAIL: memory or payload per update grew over the session")
+    print("OK: memory and payload per update stayed flat")
+
+    runs, waits = render_soak(args.hours, script=args.script)
+    print(f"\npage elements per run: created {sorted(set(runs['created']))}, updated {sorted(set(runs['updated']))}")
+    print(f"page elements per tick: created {sorted(set(waits['created']))}, updated {sorted(set(waits['updated']))}")
+    # Every run builds the same slots, a tick only updates them, and never more of them than a run placed
+    if runs['created'].nunique() != 1 or waits['created'].any() or waits['updated'].max() > runs['created'].iloc[0]:
+        raise SystemExit("FAIL: elements sent per run or per tick are not constant")
+    print("OK: elements per run and per tick stayed constant")
@@ -0,0 +1,59 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Dashboard scripts whose cold start is measured
+SCRIPTS = ['app.py', 'final_1.py', 'algo.py', 'f.py']
+
+# Run in a fresh interpreter: the script's module-level imports, i.e. everything before it can draw its first element
+FIRST_PAINT = """
+import ast, time
+started = time.perf_counter()
+tree = ast.parse(open({script!r}).read())
+imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+exec(compile(ast.Module(body=imports, type_ignores=[]), {script!r}, 'exec'))
+print(time.perf_counter() - started)
+"""
+
+# Run in a fresh interpreter: what the first dashboard run loads after its first paint
+FIRST_DATA = """
+import time
+started = time.perf_counter()
+import async_fetch, quotes, indicators, charts, scheduler, market_data, signals
+print(time.perf_counter() - started)
+"""
+
+# Run in a fresh interpreter: getting the header image's bytes
+HEADER = """
+import time
+started = time.perf_counter()
+from assets import header_image
+header_image()
+print(time.perf_counter() - started)
+"""
+
+
+# Function to run a snippet in fresh interpreters and return the median of the seconds it prints
+def cold_seconds(code, repeat):
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.split()[-1]))
+    return statistics.median(samples)
+
+
+# Measure cold start: python startup.py --repeat 5
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-to-first-paint of the dashboard scripts in fresh interpreters")
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = cold_seconds("import time; s = time.perf_counter(); import streamlit; print(time.perf_counter() - s)", args.repeat)
+    print(f"{'import streamlit':<28}{baseline * 1000:8.1f} ms")
+    for script in args.scripts:
+        seconds = cold_seconds(FIRST_PAINT.format(script=script), args.repeat)
+        print(f"{script + ' first paint':<28}{seconds * 1000:8.1f} ms")
+    print(f"{'header image':<28}{cold_seconds(HEADER, args.repeat) * 1000:8.1f} ms")
+    print(f"{'data stack (after paint)':<28}{cold_seconds(FIRST_DATA, args.repeat) * 1000:8.1f} ms")
@@ -0,0 +1,103 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool, shared_memory
+import numpy as np
+import pandas as pd
+from backtest import backtest_ema_cross
+from data_provider import get_provider
+from indicators import align_closes, ema_matrix
+from market_data import WATCHLIST
+
+# Columns of the sweep result table
+RESULT_COLUMNS = ['symbol', 'fast', 'slow', 'pnl', 'hit_rate', 'max_drawdown', 'trades']
+
+# Set in each worker by _attach_prices: a view of the close matrix in shared memory
+_worker = {}
+
+
+# Pool initializer: map the parent's close matrix instead of receiving a pickled copy
+def _attach_prices(name, shape, symbols):
+    memory = shared_memory.SharedMemory(name=name)
+    _worker['memory'] = memory  # Keep the mapping alive for the worker's lifetime
+    _worker['closes'] = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+    _worker['symbols'] = symbols
+
+
+# Function run in a worker: evaluate one chunk of (fast, slow) pairs for every symbol
+def _evaluate(pairs):
+    closes, symbols = _worker['closes'], _worker['symbols']
+    periods = sorted({period for pair in pairs for period in pair})
+    emas = ema_matrix(closes, periods)  # Each period this chunk needs, computed once for all its pairs
+
+    tables = []
+    for fast, slow in pairs:
+        stats = backtest_ema_cross(closes, fast, slow, emas, periods)
+        tables.append(pd.DataFrame({'symbol': symbols, 'fast': fast, 'slow': slow, **stats})[RESULT_COLUMNS])
+    return pd.concat(tables, ignore_index=True)
+
+
+# Function to split the grid into chunks of neighbouring pairs, which mostly share their fast period
+def make_chunks(fast_periods, slow_periods, chunk_size):
+    pairs = [(fast, slow) for fast in fast_periods for slow in slow_periods if fast < slow]
+    return [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+
+# Function to sort results best-first within each symbol
+def rank(table, metric='pnl'):
+    table = table.sort_values(['symbol', metric], ascending=[True, False])
+    table['rank'] = table.groupby('symbol').cumcount() + 1
+    return table.reset_index(drop=True)
+
+
+# Function to evaluate every (fast, slow) EMA pair across a dict of {symbol: frame} on a process pool.
+# on_update, if given, receives the best `top` pairs per symbol so far each time a chunk finishes.
+def run_sweep(frames, fast_periods, slow_periods, processes=None, chunk_size=8, metric='pnl', top=3, on_update=None):
+    _, symbols, closes = align_closes({symbol: frame for symbol, frame in frames.items() if not frame.empty})
+    memory = shared_memory.SharedMemory(create=True, size=max(closes.nbytes, 1))
+    shared = np.ndarray(closes.shape, dtype=np.float64, buffer=memory.buf)
+    try:
+        shared[:] = closes
+        tables = []
+        leaders = pd.DataFrame(columns=RESULT_COLUMNS)
+        with Pool(processes, initializer=_attach_prices, initargs=(memory.name, closes.shape, symbols)) as pool:
+            for table in pool.imap_unordered(_evaluate, make_chunks(fast_periods, slow_periods, chunk_size)):
+                tables.append(table)
+                if on_update is not None:
+                    # Only the current leaders are re-ranked, so each update costs the same however far along we are
+                    leaders = rank(pd.concat([leaders, table], ignore_index=True), metric)
+                    leaders = leaders[leaders['rank'] <= top].drop(columns='rank')
+                    on_update(leaders)
+        return rank(pd.concat(tables, ignore_index=True), metric)
+    finally:
+        del shared
+        memory.close()
+        memory.unlink()
+
+
+# Function to parse "start:stop[:step]" into a list of periods
+def parse_range(text):
+    parts = [int(part) for part in text.split(":")]
+    return list(range(parts[0], parts[1] + 1, parts[2] if len(parts) > 2 else 1))
+
+
+# Sweep EMA pairs over the watchlist: python sweep.py --fast 5:30 --slow 20:200:5 --period 10y
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank EMA crossover settings per instrument")
+    parser.add_argument("symbols", nargs="*", default=WATCHLIST)
+    parser.add_argument("--fast", type=parse_range, default=parse_range("5:30"))
+    parser.add_argument("--slow", type=parse_range, default=parse_range("20:200:5"))
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--period", default="10y")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = get_provider().download_many(args.symbols, period=args.period, interval=args.interval, progress=False)
+    started = time.perf_counter()
+    results = run_sweep(frames, args.fast, args.slow, processes=args.processes, top=args.top)
+    elapsed = time.perf_counter() - started
+
+    pairs = len(results) // max(len(frames), 1)
+    print(results[results['rank'] <= args.top].to_string(index=False))
+    print(f"\n{pairs} pairs x {len(frames)} symbols on {args.processes} processes in {elapsed:.2f}s")
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+# Environment variable pointing at another symbol file, and the one shipped next to this module
+REGISTRY_ENV = "ALGO_SYMBOLS"
+DEFAULT_REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.json")
+
+# Lot size for tickers the registry does not list
+DEFAULT_LOT_SIZE = 1500
+
+# One menu entry: label is what the menu shows, name is how suggestions refer to the instrument
+Instrument = namedtuple('Instrument', ['label', 'ticker', 'name', 'category', 'exchange', 'lot_size',
+                                       'chart_title', 'price_label'])
+
+# A menu section, and the prompt of its instrument picker
+Category = namedtuple('Category', ['name', 'prompt'])
+
+
+# Every instrument the dashboard offers, indexed once at load so each lookup is a dict access
+class SymbolRegistry:
+    def __init__(self, categories, instruments):
+        self.categories = list(categories)
+        self._categories = {category.name: category for category in self.categories}
+        self._by_label = {}
+        self._by_ticker = {}
+        self._labels = {category.name: [] for category in self.categories}
+        for instrument in instruments:
+            if instrument.label in self._by_label:
+                raise ValueError(f"Duplicate symbol label: {instrument.label}")
+            if instrument.category not in self._categories:
+                raise ValueError(f"Unknown category {instrument.category!r} for {instrument.label}")
+            self._by_label[instrument.label] = instrument
+            self._by_ticker.setdefault(instrument.ticker, instrument)  # Several labels may share a ticker
+            self._labels[instrument.category].append(instrument.label)
+
+    @classmethod
+    def load(cls, path=DEFAULT_REGISTRY_FILE):
+        with open(path) as file:
+            config = json.load(file)
+        categories = [Category(**category) for category in config['categories']]
+        instruments = [Instrument(**{'lot_size': DEFAULT_LOT_SIZE, **entry}) for entry in config['symbols']]
+        return cls(categories, instruments)
+
+    def __len__(self):
+        return len(self._by_label)
+
+    def category_names(self):
+        return [category.name for category in self.categories]
+
+    def prompt(self, category):
+        return self._categories[category].prompt
+
+    # Menu labels of a category, in file order
+    def labels(self, category):
+        return self._labels[category]
+
+    def by_label(self, label):
+        return self._by_label[label]
+
+    # The instrument for a ticker, or None if the registry does not list it
+    def by_ticker(self, ticker):
+        return self._by_ticker.get(ticker)
+
+    # Every distinct ticker, in file order
+    def tickers(self):
+        return list(self._by_ticker)
+
+    def lot_size(self, ticker):
+        instrument = self._by_ticker.get(ticker)
+        return DEFAULT_LOT_SIZE if instrument is None else instrument.lot_size
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+# Function to get the process-wide registry, loaded on first use from ALGO_SYMBOLS or symbols.json
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SymbolRegistry.load(os.environ.get(REGISTRY_ENV, DEFAULT_REGISTRY_FILE))
+        return _registry
+
+
+# Function to swap the registry, e.g. for a bigger universe
+def set_registry(registry):
+    global _registry
+    with _registry_lock:
+        _registry = registry